@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark daily forecast aggregation
+
+Compares the per-item grouping previously done in WeatherApp._update_forecast
+with weather_app.forecast.summarize_forecasts, for one city and in bulk, from
+raw payloads (parsed on the fly) and from already parsed Forecast objects.
+
+Usage: python benchmarks/forecast_aggregation.py [cities]
+"""
+
+import random
+import sys
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from weather_app.forecast import Forecast, get_local_utc_offset, summarize_forecast, summarize_forecasts
+
+CONDITIONS = [
+    (800, "Clear", "01d", "clear sky"),
+    (802, "Clouds", "03d", "scattered clouds"),
+    (804, "Clouds", "04d", "overcast clouds"),
+    (500, "Rain", "10d", "light rain"),
+    (501, "Rain", "10d", "moderate rain"),
+    (600, "Snow", "13d", "light snow")
+]
+
+def make_forecast(seed: int, start: int = 1760659200) -> dict:
+    """Build a synthetic 5-day / 3-hour forecast payload (40 slots) shaped like the API's"""
+    rng = random.Random(seed)
+    items = []
+    for slot in range(40):
+        condition_id, condition, icon, description = rng.choice(CONDITIONS)
+        temp = round(rng.uniform(-5, 30), 2)
+        dt = start + slot * 10800
+        items.append({
+            "dt": dt,
+            "main": {
+                "temp": temp,
+                "feels_like": round(temp - rng.uniform(0, 3), 2),
+                "temp_min": round(temp - rng.uniform(0, 1), 2),
+                "temp_max": round(temp + rng.uniform(0, 1), 2),
+                "pressure": rng.randint(990, 1030),
+                "sea_level": rng.randint(990, 1030),
+                "grnd_level": rng.randint(980, 1020),
+                "humidity": rng.randint(30, 100),
+                "temp_kf": round(rng.uniform(-1, 1), 2)
+            },
+            "weather": [{"id": condition_id, "main": condition, "description": description, "icon": icon}],
+            "clouds": {"all": rng.randint(0, 100)},
+            "wind": {"speed": round(rng.uniform(0, 12), 2), "deg": rng.randint(0, 359),
+                     "gust": round(rng.uniform(0, 18), 2)},
+            "visibility": 10000,
+            "pop": round(rng.random(), 2),
+            "sys": {"pod": "d" if 6 <= (slot * 3) % 24 < 18 else "n"},
+            "dt_txt": datetime.fromtimestamp(dt, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        })
+    return {
+        "cod": "200",
+        "message": 0,
+        "cnt": 40,
+        "list": items,
+        "city": {
+            "id": 1000000 + seed,
+            "name": f"City {seed}",
+            "coord": {"lat": round(rng.uniform(-60, 60), 4), "lon": round(rng.uniform(-180, 180), 4)},
+            "country": "GB",
+            "population": rng.randint(10000, 10000000),
+            "timezone": 0,
+            "sunrise": start + 25000,
+            "sunset": start + 60000
+        }
+    }
+
+def legacy_summarize(data: dict) -> list:
+    """The aggregation as previously done inline in WeatherApp._update_forecast"""
+    daily_forecasts = {}
+    for item in data['list']:
+        date = datetime.fromtimestamp(item['dt']).strftime('%Y-%m-%d')
+        if date not in daily_forecasts:
+            daily_forecasts[date] = []
+        daily_forecasts[date].append(item)
+
+    days = []
+    for date, forecasts in list(daily_forecasts.items())[:5]:
+        day_name = datetime.strptime(date, '%Y-%m-%d').strftime('%a')
+        temps = [f['main']['temp'] for f in forecasts]
+        conditions = [f['weather'][0] for f in forecasts]
+        main_condition = max(set(c['main'] for c in conditions),
+                             key=lambda x: sum(1 for c in conditions if c['main'] == x))
+        icon_codes = [c['icon'] for c in conditions]
+        main_icon = max(set(icon_codes), key=icon_codes.count)
+        descriptions = [c['description'] for c in conditions]
+        main_desc = max(set(descriptions), key=descriptions.count)
+        days.append((day_name, max(temps), min(temps), main_condition, main_icon, main_desc))
+    return days
+
+def best_time(func, number: int) -> float:
+    """Best average seconds per call over a few repeats"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+def main():
+    cities = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    payloads = [make_forecast(seed) for seed in range(cities)]
+
+    # Same days and temperature ranges as the old implementation, which
+    # split days in this computer's timezone instead of the city's
+    local_offset = get_local_utc_offset(payloads[0]["list"][0]["dt"])
+    for data in payloads[:50]:
+        legacy = legacy_summarize(data)
+        summary = summarize_forecast(data, utc_offset=local_offset)
+        assert [(d[0], d[1], d[2]) for d in legacy] == \
+            [(d["day_name"], d["temp_high"], d["temp_low"]) for d in summary]
+
+    forecasts = [Forecast.from_payload(data) for data in payloads]
+
+    single_legacy = best_time(lambda: legacy_summarize(payloads[0]), 200)
+    bulk_legacy = best_time(lambda: [legacy_summarize(data) for data in payloads], 1)
+    rows = [
+        ("1 city, payload", single_legacy, best_time(lambda: summarize_forecast(payloads[0]), 200)),
+        ("1 city, Forecast", single_legacy, best_time(lambda: summarize_forecast(forecasts[0]), 200)),
+        (f"{cities} cities, payloads", bulk_legacy, best_time(lambda: summarize_forecasts(payloads), 1)),
+        (f"{cities} cities, Forecasts", bulk_legacy, best_time(lambda: summarize_forecasts(forecasts), 1))
+    ]
+
+    print(f"{'':<24}{'legacy':>12}{'vectorized':>12}{'speedup':>10}")
+    for label, legacy, new in rows:
+        print(f"{label:<24}{legacy * 1e3:>10.3f}ms{new * 1e3:>10.3f}ms{legacy / new:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
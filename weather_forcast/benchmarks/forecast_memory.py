@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark memory held per city by forecast data
+
+Measures with tracemalloc the bytes retained by decoded forecast payloads
+(what WeatherApp.forecast_data used to keep) and by parsed Forecast objects.
+
+Usage: python benchmarks/forecast_memory.py [cities]
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from forecast_aggregation import make_forecast
+from weather_app.forecast import Forecast
+
+def measure(build) -> tuple:
+    """Return (result, bytes still allocated after build())"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+def main():
+    cities = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    # Encoded like HTTP responses so every payload is decoded separately
+    encoded = [json.dumps(make_forecast(seed)) for seed in range(cities)]
+
+    # Warm the condition tables so they are not counted against the first city
+    Forecast.from_payload(json.loads(encoded[0]))
+
+    raw, raw_bytes = measure(lambda: [json.loads(body) for body in encoded])
+    parsed, parsed_bytes = measure(lambda: [Forecast.from_payload(data) for data in raw])
+
+    print(f"{cities} cities, {len(parsed[0])} slots each")
+    print(f"{'raw payload dicts':<24}{raw_bytes / cities:>10,.0f} bytes/city")
+    print(f"{'Forecast (columnar)':<24}{parsed_bytes / cities:>10,.0f} bytes/city")
+    print(f"{'reduction':<24}{raw_bytes / parsed_bytes:>10.1f}x")
+
+if __name__ == "__main__":
+    main()
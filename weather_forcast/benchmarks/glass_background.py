@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark glass background rendering and check the fast mode's output
+
+Renders every bundled background at full resolution and in fast mode
+(blurred at reduced resolution, then upscaled), times both, and fails if
+the fast output differs visibly from the full-resolution one.
+
+Usage: python benchmarks/glass_background.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from weather_app.backgrounds import get_blur_scale, render_glass_background
+from weather_app.config import BACKGROUNDS_DIR, GLASS_BLUR_RADIUS
+
+SIZES = [(1200, 800), (1920, 1080), (3840, 2160)]
+
+# Largest accepted difference per channel (0-255): mean over the image and
+# the 99.9th percentile, which ignores a handful of edge pixels
+MAX_MEAN_DIFF = 1.0
+MAX_P999_DIFF = 4
+
+def best_time(func) -> float:
+    """Best seconds per call over a few repeats"""
+    return min(timeit.repeat(func, number=1, repeat=3))
+
+def main():
+    sources = sorted(path for path in BACKGROUNDS_DIR.iterdir()
+                     if path.suffix.lower() in (".jpg", ".jpeg", ".png"))
+    print(f"Blur radius {GLASS_BLUR_RADIUS}, fast mode blurs at 1/{get_blur_scale(GLASS_BLUR_RADIUS)} scale")
+    print(f"{'source':<14}{'size':>11}{'full':>10}{'fast':>10}{'speedup':>9}{'mean diff':>11}{'p99.9':>7}")
+
+    failures = 0
+    for source in sources:
+        for size in SIZES:
+            full = render_glass_background(str(source), size, fast=False)
+            fast = render_glass_background(str(source), size, fast=True)
+            diff = np.abs(np.asarray(full, dtype=np.int16) - np.asarray(fast, dtype=np.int16))
+            mean_diff, p999 = diff.mean(), np.percentile(diff, 99.9)
+
+            full_time = best_time(lambda: render_glass_background(str(source), size, fast=False))
+            fast_time = best_time(lambda: render_glass_background(str(source), size, fast=True))
+            ok = mean_diff <= MAX_MEAN_DIFF and p999 <= MAX_P999_DIFF
+            failures += not ok
+            print(f"{source.name:<14}{size[0]:>5}x{size[1]:<5}{full_time * 1e3:>8.0f}ms{fast_time * 1e3:>8.0f}ms"
+                  f"{full_time / fast_time:>8.1f}x{mean_diff:>11.2f}{p999:>7.0f}{'' if ok else '  FAIL'}")
+
+    if failures:
+        print(f"{failures} renders exceed the visual tolerance")
+        sys.exit(1)
+    print("Fast renders are within tolerance")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark decoding of API payloads
+
+Times a bulk refresh (current weather and forecast for many cities, each
+decoded and then sized and serialized for the caches) with the stdlib json
+module, as response.json() did, against
+weather_app.api_client.decode_payload, which uses the fastest installed
+backend and drops the fields the app never reads. Payloads are the samples
+in benchmarks/fixtures.
+
+Usage: python benchmarks/json_decoding.py [cities]
+"""
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from weather_app.api_client import JSON_BACKEND, UNUSED_CURRENT_FIELDS, UNUSED_FORECAST_FIELDS, decode_payload
+from weather_app.lru_cache import estimate_size
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+def best_time(func) -> float:
+    """Best seconds per call over a few repeats"""
+    return min(timeit.repeat(func, number=1, repeat=7))
+
+def main():
+    cities = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    current = (FIXTURES_DIR / "current_weather.json").read_bytes()
+    forecast = (FIXTURES_DIR / "forecast.json").read_bytes()
+    bodies = [(current, UNUSED_CURRENT_FIELDS), (forecast, UNUSED_FORECAST_FIELDS)] * cities
+
+    def store(data):
+        """What caching a payload costs: size estimate plus disk serialization"""
+        estimate_size(data)
+        json.dumps({"key": "", "data": data}, separators=(",", ":"))
+        return data
+
+    def stdlib():
+        return [store(json.loads(body)) for body, _ in bodies]
+
+    def backend():
+        return [store(decode_payload(body)) for body, _ in bodies]
+
+    def trimmed():
+        return [store(decode_payload(body, unused)) for body, unused in bodies]
+
+    full_size = estimate_size(json.loads(current)) + estimate_size(json.loads(forecast))
+    kept_size = (estimate_size(decode_payload(current, UNUSED_CURRENT_FIELDS))
+                 + estimate_size(decode_payload(forecast, UNUSED_FORECAST_FIELDS)))
+
+    baseline = best_time(stdlib)
+    print(f"Bulk refresh of {cities} cities ({len(bodies)} payloads decoded and cached), "
+          f"backend: {JSON_BACKEND}")
+    for label, func in [("stdlib json (before)", stdlib),
+                        (f"{JSON_BACKEND}, full payload", backend),
+                        (f"{JSON_BACKEND}, unused dropped", trimmed)]:
+        elapsed = baseline if func is stdlib else best_time(func)
+        print(f"{label:<28}{elapsed * 1e3:>9.2f}ms{elapsed / cities * 1e6:>9.1f}us/city"
+              f"{baseline / elapsed:>8.1f}x")
+    print(f"Cached size per city: {full_size:,} bytes full, {kept_size:,} bytes trimmed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark reduced-scale decoding of oversized background sources
+
+Generates a large photo-like JPEG and PNG, then fits them to window sizes
+as the old loader did (full decode, LANCZOS resize) and via
+open_image_reduced (JPEG draft decoding, Image.reduce). Reports the time,
+the peak memory growth of each (measured in a fresh process, since Pillow
+allocates outside tracemalloc's view) and the difference between the
+outputs.
+
+Usage: python benchmarks/large_image_decoding.py [source width]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from weather_app.backgrounds import fit_to_size
+from weather_app.utils import open_image_reduced
+
+SIZES = [(1280, 800), (1920, 1080)]
+
+def make_photo(width: int, height: int) -> Image.Image:
+    """Smooth colour gradients with grain, which compress like a photo"""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    channels = [
+        128 + 100 * np.sin(x / width * 6 + phase) * np.cos(y / height * 4 - phase)
+        for phase in (0.0, 1.3, 2.6)
+    ]
+    pixels = np.stack(channels, axis=-1) + rng.normal(0, 12, (height, width, 3))
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+def fit_full(path: str, size) -> Image.Image:
+    """The loader before reduced decoding"""
+    with Image.open(path) as source:
+        return fit_to_size(source.convert("RGB"), size)
+
+def fit_reduced(path: str, size) -> Image.Image:
+    """The loader with reduced-scale decoding"""
+    return fit_to_size(open_image_reduced(path, size, cover=True).convert("RGB"), size)
+
+LOADERS = {"full": fit_full, "reduced": fit_reduced}
+
+def measure_peak(loader: str, path: str, size) -> float:
+    """Peak memory growth in MB of one load, in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, __file__, "--peak", loader, path, str(size[0]), str(size[1])],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)["peak_mb"]
+
+def get_peak_rss() -> int:
+    """Peak resident memory of this process in bytes"""
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    import resource  # Unix only
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+def reset_peak_rss():
+    """Restart peak tracking from the current size where the OS allows it"""
+    # Linux keeps the peak across exec(), so the child would otherwise
+    # report the benchmark process's own peak
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+def run_peak(loader: str, path: str, width: str, height: str):
+    """Child process side of measure_peak"""
+    reset_peak_rss()
+    before = get_peak_rss()
+    LOADERS[loader](path, (int(width), int(height)))
+    print(json.dumps({"peak_mb": (get_peak_rss() - before) / 2**20}))
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 6000
+    height = width * 2 // 3
+    photo = make_photo(width, height)
+
+    with tempfile.TemporaryDirectory() as directory:
+        sources = [Path(directory) / "photo.jpg", Path(directory) / "photo.png"]
+        photo.save(sources[0], quality=90)
+        photo.save(sources[1], compress_level=1)
+        del photo
+
+        print(f"Source {width}x{height}")
+        print(f"{'source':<11}{'size':>11}{'full':>9}{'reduced':>9}{'speedup':>9}"
+              f"{'full peak':>11}{'reduced':>9}{'mean diff':>11}")
+        for source in sources:
+            for size in SIZES:
+                path = str(source)
+                full = np.asarray(fit_full(path, size), dtype=np.int16)
+                reduced = np.asarray(fit_reduced(path, size), dtype=np.int16)
+                mean_diff = np.abs(full - reduced).mean()
+
+                full_time = min(timeit.repeat(lambda: fit_full(path, size), number=1, repeat=3))
+                reduced_time = min(timeit.repeat(lambda: fit_reduced(path, size), number=1, repeat=3))
+                full_peak = measure_peak("full", path, size)
+                reduced_peak = measure_peak("reduced", path, size)
+                print(f"{source.suffix[1:]:<11}{size[0]:>5}x{size[1]:<5}{full_time * 1e3:>7.0f}ms"
+                      f"{reduced_time * 1e3:>7.0f}ms{full_time / reduced_time:>8.1f}x"
+                      f"{full_peak:>9.0f}MB{reduced_peak:>7.0f}MB{mean_diff:>11.2f}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--peak":
+        run_peak(*sys.argv[2:])
+    else:
+        main()
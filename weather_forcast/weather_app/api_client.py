@@ -1,63 +1,393 @@
-
 import requests
 import json
 import time
-from typing import Dict, Optional, Tuple
-from .config import OPENWEATHER_API_KEY, OPENWEATHER_BASE_URL, CACHE_DIR, CACHE_DURATION
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+from .config import (
+    OPENWEATHER_API_KEY, OPENWEATHER_BASE_URL, OPENWEATHER_GEO_URL, CACHE_DIR, CACHE_DURATION, MAX_CONCURRENT_REQUESTS,
+    CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_PURGE_INTERVAL, STALE_CACHE_DURATION,
+    STALE_WHILE_REVALIDATE, SERVE_STALE_ON_ERROR, RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST,
+    RATE_LIMIT_MAX_WAIT, RETRY_MAX_RETRIES, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RECOVERY_TIMEOUT
+)
+from .http_pool import PooledHTTPSession, get_shared_session
+from .disk_cache import DiskCache
+from .lru_cache import LRUCache
+from .singleflight import SingleFlight
+from .rate_limit import TokenBucket, RateLimitTimeout
+from .resilience import RetryPolicy, CircuitBreaker, is_transient_error, get_retry_after
+from .locations import LocationResolver, LocationNotFound, normalize_query
+from .units import CANONICAL_UNITS, API_UNITS, convert_current, convert_forecast
+
+# Use a faster JSON decoder when one is installed
+try:
+    import orjson
+    JSON_BACKEND = "orjson"
+    _json_loads = orjson.loads  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+except ImportError:
+    try:
+        import ujson
+        JSON_BACKEND = "ujson"
+
+        def _json_loads(content):
+            try:
+                return ujson.loads(content)
+            except ValueError as e:
+                raise json.JSONDecodeError(str(e), "", 0) from e
+    except ImportError:
+        JSON_BACKEND = "json"
+        _json_loads = json.loads
+
+# Parts of the API payloads the app never reads; None drops a key, a dict
+# drops keys inside its value (applied to every element of a list)
+UNUSED_CURRENT_FIELDS = {
+    "base": None,
+    "cod": None,
+    "clouds": None,
+    "main": {"sea_level": None, "grnd_level": None},
+    "sys": {"type": None, "id": None, "message": None}
+}
+UNUSED_FORECAST_FIELDS = {
+    "cod": None,
+    "message": None,
+    "list": {
+        "clouds": None,
+        "visibility": None,
+        "sys": None,
+        "dt_txt": None,
+        "rain": None,
+        "snow": None,
+        "main": {"sea_level": None, "grnd_level": None, "temp_kf": None}
+    },
+    "city": {"population": None}
+}
+
+def drop_fields(data, fields: Dict):
+    """Remove the given fields from a decoded JSON value in place and return it"""
+    if isinstance(data, list):
+        for item in data:
+            drop_fields(item, fields)
+    elif isinstance(data, dict):
+        for key, subfields in fields.items():
+            if subfields is None:
+                data.pop(key, None)
+            elif key in data:
+                drop_fields(data[key], subfields)
+    return data
+
+def decode_payload(content: bytes, unused_fields: Optional[Dict] = None):
+    """
+    Decode a JSON response body, dropping fields the app does not use
+
+    Raises:
+        requests.exceptions.JSONDecodeError: If the body is not valid JSON
+            (like response.json(), both a RequestException and a
+            json.JSONDecodeError)
+    """
+    try:
+        data = _json_loads(content)
+    except json.JSONDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+    if unused_fields:
+        drop_fields(data, unused_fields)
+    return data
 
 class WeatherAPIClient:
     """Client for fetching weather data from OpenWeatherMap API"""
 
-    def __init__(self):
+    # Endpoint and cache key prefix for each kind of weather data
+    ENDPOINTS = {
+        "current": ("weather", ""),
+        "forecast": ("forecast", "forecast_")
+    }
+
+    # Payload fields dropped for each kind of weather data
+    UNUSED_FIELDS = {
+        "current": UNUSED_CURRENT_FIELDS,
+        "forecast": UNUSED_FORECAST_FIELDS
+    }
+
+    # Converters from canonical (metric) payloads to the requested units
+    CONVERTERS = {
+        "current": convert_current,
+        "forecast": convert_forecast
+    }
+
+    def __init__(self, session: Optional[PooledHTTPSession] = None,
+                 disk_cache: Optional[DiskCache] = None, persist_cache: bool = True,
+                 stale_while_revalidate: bool = STALE_WHILE_REVALIDATE,
+                 serve_stale_on_error: bool = SERVE_STALE_ON_ERROR,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            session: Pooled HTTP session to send requests through. Defaults to
+                the shared session also used by the icon downloader.
+            disk_cache: Persistent cache backing the in-memory cache. Defaults
+                to a DiskCache under CACHE_DIR.
+            persist_cache: Set to False to keep responses in memory only
+            stale_while_revalidate: Return expired cache entries immediately and
+                refresh them in the background
+            serve_stale_on_error: Return expired cache entries when the API
+                request fails
+            rate_limiter: Limiter every API request waits on. Defaults to a
+                TokenBucket using RATE_LIMIT_PER_MINUTE and RATE_LIMIT_BURST.
+            retry_policy: Backoff policy for transient errors. Defaults to the
+                RETRY_* settings.
+            circuit_breaker: Breaker that fails fast while the API is down.
+                Defaults to the CIRCUIT_* settings.
+
+        Stale data is at most STALE_CACHE_DURATION seconds past expiry and is
+        returned as a copy with "_stale": True and "_age" (seconds) set.
+        """
         self.api_key = OPENWEATHER_API_KEY
         self.base_url = OPENWEATHER_BASE_URL
-        self.cache = {}
+        self.geo_url = OPENWEATHER_GEO_URL
+        self.cache = LRUCache(max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES,
+                              ttl=CACHE_DURATION, stale_ttl=STALE_CACHE_DURATION)
+        self.cache.start_purger(CACHE_PURGE_INTERVAL)
+        self.http = session or get_shared_session()
+        self.disk_cache = (disk_cache or DiskCache()) if persist_cache else None
+        self._flights = SingleFlight()
+        self.rate_limiter = rate_limiter or TokenBucket(RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST)
+        self.retry_policy = retry_policy or RetryPolicy(
+            RETRY_MAX_RETRIES, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX
+        )
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RECOVERY_TIMEOUT
+        )
 
-    def _get_cache_key(self, city: str, units: str) -> str:
-        """Generate cache key for storing weather data"""
-        return f"{city.lower()}_{units}"
+        self.stale_while_revalidate = stale_while_revalidate
+        self.serve_stale_on_error = serve_stale_on_error
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
 
-    def _is_cache_valid(self, timestamp: float) -> bool:
-        """Check if cached data is still valid"""
-        return time.time() - timestamp < CACHE_DURATION
+        self.locations = LocationResolver(
+            self._geocode, CACHE_DIR / "locations.json" if persist_cache else None
+        )
 
-    def get_current_weather(self, city: str, units: str = "metric") -> Optional[Dict]:
+    def _get_target(self, kind: str, city: str) -> Dict:
         """
-        Fetch current weather for a city
+        Resolve a city query to its cache key and API query parameters
 
-        Args:
-            city: City name
-            units: Temperature units (metric, imperial, kelvin)
+        Queries are resolved to a canonical location, so every spelling of a
+        place shares one cache key. Data is cached in canonical units, so the
+        key does not depend on the units requested by the caller either.
 
-        Returns:
-            Weather data dictionary or None if error
+        Raises:
+            LocationNotFound: If the query matches no known location
         """
-        cache_key = self._get_cache_key(city, units)
+        prefix = self.ENDPOINTS[kind][1]
+        try:
+            location = self.locations.resolve(city)
+        except LocationNotFound:
+            raise
+        except requests.exceptions.RequestException as e:
+            # Geocoding unavailable, query the weather endpoint by name instead
+            print(f"Error resolving location: {e}")
+            return {"key": f"{prefix}{normalize_query(city)}", "params": {"q": city}, "name": None}
 
-        # Check cache first
-        if cache_key in self.cache:
-            data, timestamp = self.cache[cache_key]
-            if self._is_cache_valid(timestamp):
+        return {
+            "key": f"{prefix}{location['id']}",
+            "params": {"lat": location["lat"], "lon": location["lon"]},
+            "name": location["name"]
+        }
+
+    def _get_cached(self, cache_key: str) -> Optional[Dict]:
+        """Return cached data if present and still valid, checking memory then disk"""
+        data = self.cache.get(cache_key)
+        if data is not None:
+            return data
+
+        if self.disk_cache is not None:
+            entry = self.disk_cache.get(cache_key)
+            if entry is not None:
+                data, timestamp = entry
+                self.cache.set(cache_key, data, timestamp)
                 return data
+        return None
 
-        try:
-            url = f"{self.base_url}weather"
-            params = {
-                "q": city,
-                "appid": self.api_key,
-                "units": units
-            }
+    def _get_stale(self, cache_key: str) -> Optional[Dict]:
+        """Return an expired cache entry, marked with its age, if one is still retained"""
+        entry = self.cache.get_entry(cache_key, allow_stale=True)
+        if entry is None and self.disk_cache is not None:
+            entry = self.disk_cache.get(cache_key, max_age=CACHE_DURATION + STALE_CACHE_DURATION)
+        if entry is None:
+            return None
+
+        data, timestamp = entry
+        stale = dict(data)
+        stale["_stale"] = True
+        stale["_age"] = time.time() - timestamp
+        return stale
+
+    def _revalidate(self, kind: str, target: Dict):
+        """Refresh a cache entry on a background thread"""
+        cache_key = target["key"]
+        with self._revalidating_lock:
+            if cache_key in self._revalidating:
+                return
+            self._revalidating.add(cache_key)
 
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
+        def refresh():
+            try:
+                self._fetch_shared(kind, target)
+            except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+                print(f"Error refreshing cached data: {e}")
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(cache_key)
 
-            data = response.json()
+        thread = threading.Thread(target=refresh)
+        thread.daemon = True
+        thread.start()
 
-            # Cache the data
-            self.cache[cache_key] = (data, time.time())
+    def _store(self, cache_key: str, data: Dict):
+        """Cache data in memory and on disk"""
+        timestamp = time.time()
+        self.cache.set(cache_key, data, timestamp)
+        if self.disk_cache is not None:
+            self.disk_cache.set(cache_key, data, timestamp)
 
+    def _request(self, url: str, params: Dict):
+        """
+        Send an API request, retrying transient errors with backoff
+
+        Each attempt waits for the rate limiter and is checked against the
+        circuit breaker.
+
+        Raises:
+            RateLimitTimeout: If no request slot frees up within RATE_LIMIT_MAX_WAIT
+            CircuitOpenError: If the API has been failing and the circuit is open
+            requests.exceptions.RequestException: On network or HTTP errors
+        """
+        attempt = 0
+        while True:
+            if not self.rate_limiter.acquire(timeout=RATE_LIMIT_MAX_WAIT):
+                raise RateLimitTimeout("Rate limit reached, request not sent")
+            self.circuit_breaker.before_call()
+
+            try:
+                response = self.http.get(url, params=params)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                if not is_transient_error(e):
+                    # The service answered (e.g. 404 for an unknown city)
+                    self.circuit_breaker.record_success()
+                    raise
+
+                self.circuit_breaker.record_failure()
+                retry_after = get_retry_after(e)
+                if e.response is not None and e.response.status_code == 429:
+                    # Back off every queued request, not just this one
+                    self.rate_limiter.defer(retry_after if retry_after is not None else 60)
+
+                delay = self.retry_policy.get_delay(attempt, retry_after)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.circuit_breaker.record_success()
+            return response
+
+    def _geocode(self, query: str, limit: int) -> list:
+        """
+        Look up locations matching a query with the geocoding API
+
+        Raises:
+            requests.exceptions.RequestException: On network or HTTP errors
+        """
+        url = f"{self.geo_url}direct"
+        params = {
+            "q": query,
+            "limit": limit,
+            "appid": self.api_key
+        }
+
+        response = self._request(url, params)
+        return decode_payload(response.content)
+
+    def _fetch(self, kind: str, target: Dict) -> Dict:
+        """
+        Fetch weather data in canonical units from the API and cache it
+
+        Raises:
+            requests.exceptions.RequestException: On network or HTTP errors
+            json.JSONDecodeError: If the response is not valid JSON
+        """
+        endpoint = self.ENDPOINTS[kind][0]
+        url = f"{self.base_url}{endpoint}"
+        params = dict(target["params"])
+        params["appid"] = self.api_key
+        params["units"] = API_UNITS[CANONICAL_UNITS]
+
+        response = self._request(url, params)
+        data = decode_payload(response.content, self.UNUSED_FIELDS[kind])
+
+        # Coordinates resolve to the nearest station, keep the searched name
+        if kind == "current" and target["name"]:
+            data["name"] = target["name"]
+
+        # Cache the data
+        self._store(target["key"], data)
+
+        return data
+
+    def _fetch_shared(self, kind: str, target: Dict) -> Dict:
+        """Fetch data, sharing one upstream call among identical concurrent requests"""
+        return self._flights.do(target["key"], self._fetch, kind, target)
+
+    def _get(self, kind: str, city: str) -> Dict:
+        """
+        Return cached canonical data or fetch it, applying the stale-data policies
+
+        Raises:
+            requests.exceptions.RequestException: On network or HTTP errors
+                when no stale data can be served
+            json.JSONDecodeError: If the response is not valid JSON
+        """
+        target = self._get_target(kind, city)
+        cache_key = target["key"]
+
+        # Check cache first
+        data = self._get_cached(cache_key)
+        if data is not None:
             return data
 
+        stale = None
+        if self.stale_while_revalidate or self.serve_stale_on_error:
+            stale = self._get_stale(cache_key)
+
+        if stale is not None and self.stale_while_revalidate:
+            self._revalidate(kind, target)
+            return stale
+
+        try:
+            return self._fetch_shared(kind, target)
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            if stale is not None and self.serve_stale_on_error:
+                print(f"Serving cached data after error: {e}")
+                return stale
+            raise
+
+    def get_current_weather(self, city: str, units: str = "metric") -> Optional[Dict]:
+        """
+        Fetch current weather for a city
+
+        Args:
+            city: City name
+            units: Temperature units (metric, imperial, kelvin)
+
+        Returns:
+            Weather data dictionary or None if error
+        """
+        try:
+            return convert_current(self._get("current", city), units)
+
         except requests.exceptions.RequestException as e:
             print(f"Error fetching weather data: {e}")
             return None
@@ -76,31 +406,8 @@ class WeatherAPIClient:
         Returns:
             Forecast data dictionary or None if error
         """
-        cache_key = f"forecast_{self._get_cache_key(city, units)}"
-
-        # Check cache first
-        if cache_key in self.cache:
-            data, timestamp = self.cache[cache_key]
-            if self._is_cache_valid(timestamp):
-                return data
-
         try:
-            url = f"{self.base_url}forecast"
-            params = {
-                "q": city,
-                "appid": self.api_key,
-                "units": units
-            }
-
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-
-            data = response.json()
-
-            # Cache the data
-            self.cache[cache_key] = (data, time.time())
-
-            return data
+            return convert_forecast(self._get("forecast", city), units)
 
         except requests.exceptions.RequestException as e:
             print(f"Error fetching forecast data: {e}")
@@ -109,30 +416,170 @@ class WeatherAPIClient:
             print(f"Error parsing forecast data: {e}")
             return None
 
-    def search_cities(self, query: str, limit: int = 5) -> list:
+    def get_many_current(self, cities: Iterable[str], units: str = "metric",
+                         max_workers: int = MAX_CONCURRENT_REQUESTS) -> Dict:
+        """
+        Fetch current weather for many cities
+
+        Args:
+            cities: City names (duplicates are fetched once)
+            units: Temperature units (metric, imperial, kelvin)
+            max_workers: Maximum number of requests in flight at once
+
+        Returns:
+            Dictionary with "results" (city -> data), "errors" (city -> message)
+            and "stats" (request counts, cache hits/misses and wall time)
+        """
+        return self._get_many("current", cities, units, max_workers)
+
+    def get_many_forecasts(self, cities: Iterable[str], units: str = "metric",
+                           max_workers: int = MAX_CONCURRENT_REQUESTS) -> Dict:
+        """
+        Fetch 5-day forecasts for many cities
+
+        Args:
+            cities: City names (duplicates are fetched once)
+            units: Temperature units (metric, imperial, kelvin)
+            max_workers: Maximum number of requests in flight at once
+
+        Returns:
+            Dictionary with "results" (city -> data), "errors" (city -> message)
+            and "stats" (request counts, cache hits/misses and wall time)
+        """
+        return self._get_many("forecast", cities, units, max_workers)
+
+    def _get_many(self, kind: str, cities: Iterable[str], units: str, max_workers: int) -> Dict:
+        """Serve cache hits directly and fetch misses on a bounded worker pool"""
+        start = time.perf_counter()
+        convert = self.CONVERTERS[kind]
+        cities = list(cities)
+
+        results = {}
+        errors = {}
+
+        # Resolve each distinct query to its canonical location (usually cached)
+        queries = {}
+        for city in cities:
+            queries.setdefault(normalize_query(city), city)
+        workers = max(1, min(max_workers, len(queries)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            resolved = {
+                query: executor.submit(self._get_target, kind, city)
+                for query, city in queries.items()
+            }
+
+        # Deduplicate by cache key, remembering every spelling that maps to it
+        requested = {}
+        targets = {}
+        for city in cities:
+            try:
+                target = resolved[normalize_query(city)].result()
+            except requests.exceptions.RequestException as e:
+                errors[city] = str(e)
+                continue
+            targets[target["key"]] = target
+            requested.setdefault(target["key"], []).append(city)
+
+        misses = {}
+        for cache_key, names in requested.items():
+            data = self._get_cached(cache_key)
+            if data is not None:
+                for name in names:
+                    results[name] = data
+            else:
+                misses[cache_key] = names
+
+        if misses:
+            workers = max(1, min(max_workers, len(misses)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    cache_key: executor.submit(self._fetch_shared, kind, targets[cache_key])
+                    for cache_key, names in misses.items()
+                }
+                for cache_key, future in futures.items():
+                    try:
+                        data = future.result()
+                        for name in misses[cache_key]:
+                            results[name] = data
+                    except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+                        stale = self._get_stale(cache_key) if self.serve_stale_on_error else None
+                        for name in misses[cache_key]:
+                            if stale is not None:
+                                results[name] = stale
+                            else:
+                                errors[name] = str(e)
+        else:
+            workers = 0
+
+        return {
+            "results": {name: convert(data, units) for name, data in results.items()},
+            "errors": errors,
+            "stats": {
+                "requested": len(cities),
+                "unique": len(requested),
+                "cache_hits": len(requested) - len(misses),
+                "cache_misses": len(misses),
+                "workers": workers,
+                "wall_time": time.perf_counter() - start
+            }
+        }
+
+    def resolve_city(self, city: str) -> Dict:
+        """
+        Resolve a city query to its location, cached across runs
+
+        Returns:
+            Location dictionary with "id", "name", "country", "lat" and "lon"
+
+        Raises:
+            LocationNotFound: If the geocoding API knows no such place
+            requests.exceptions.RequestException: If the lookup fails
+        """
+        return self.locations.resolve(city)
+
+    def search_cities(self, query: str, limit: int = 5, raise_errors: bool = False) -> list:
         """
         Search for cities by name
 
         Args:
             query: Search query
             limit: Maximum number of results
+            raise_errors: Raise on failure instead of returning an empty list,
+                so callers can tell "no matches" from "lookup failed"
 
         Returns:
-            List of city data dictionaries
+            List of location dictionaries ("id", "name", "country", "lat", "lon"
+            and "state" when known), cached across runs
+
+        Raises:
+            requests.exceptions.RequestException: If the lookup fails and
+                raise_errors is set
         """
         try:
-            url = f"http://api.openweathermap.org/geo/1.0/direct"
-            params = {
-                "q": query,
-                "limit": limit,
-                "appid": self.api_key
-            }
-
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-
-            return response.json()
+            return self.locations.search(query, limit)
 
         except requests.exceptions.RequestException as e:
+            if raise_errors:
+                raise
             print(f"Error searching cities: {e}")
             return []
+
+    def get_connection_stats(self) -> Dict:
+        """Get connection pool reuse statistics"""
+        return self.http.get_stats()
+
+    def get_cache_stats(self) -> Dict:
+        """Get in-memory cache hit/miss/eviction statistics"""
+        return self.cache.get_stats()
+
+    def get_coalescing_stats(self) -> Dict:
+        """Get counts of upstream fetches executed and requests collapsed into them"""
+        return self._flights.get_stats()
+
+    def get_rate_limit_stats(self) -> Dict:
+        """Get time spent throttled by the client-side rate limiter"""
+        return self.rate_limiter.get_stats()
+
+    def get_circuit_stats(self) -> Dict:
+        """Get circuit breaker state and counters"""
+        return self.circuit_breaker.get_stats()
@@ -0,0 +1,80 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Iterable, Optional, Tuple
+from .api_client import WeatherAPIClient
+from .config import MAX_CONCURRENT_REQUESTS
+
+class AsyncWeatherAPIClient:
+    """
+    Asyncio interface to WeatherAPIClient
+
+    Each call runs the blocking client on a worker pool of max_concurrency
+    threads, which bounds parallelism and shares the pooled HTTP session
+    and response cache with the synchronous client.
+    """
+
+    def __init__(self, client: Optional[WeatherAPIClient] = None,
+                 max_concurrency: int = MAX_CONCURRENT_REQUESTS):
+        """
+        Args:
+            client: Synchronous client to delegate to (a new one by default)
+            max_concurrency: Maximum number of requests in flight at once
+        """
+        self.client = client or WeatherAPIClient()
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix="weather-async")
+
+    async def _run(self, func, *args):
+        """Run a blocking client call on the worker pool without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    async def get_current_weather(self, city: str, units: str = "metric") -> Optional[Dict]:
+        """Fetch current weather for a city (see WeatherAPIClient.get_current_weather)"""
+        return await self._run(self.client.get_current_weather, city, units)
+
+    async def get_forecast(self, city: str, units: str = "metric") -> Optional[Dict]:
+        """Fetch 5-day forecast for a city (see WeatherAPIClient.get_forecast)"""
+        return await self._run(self.client.get_forecast, city, units)
+
+    async def search_cities(self, query: str, limit: int = 5) -> list:
+        """Search for cities by name (see WeatherAPIClient.search_cities)"""
+        return await self._run(self.client.search_cities, query, limit)
+
+    async def get_weather_and_forecast(self, city: str,
+                                       units: str = "metric") -> Tuple[Optional[Dict], Optional[Dict]]:
+        """
+        Fetch current weather and forecast for a city concurrently
+
+        Returns:
+            Tuple of (current weather, forecast), either may be None on error
+        """
+        current, forecast = await asyncio.gather(
+            self.get_current_weather(city, units),
+            self.get_forecast(city, units)
+        )
+        return current, forecast
+
+    async def fetch_cities(self, cities: Iterable[str],
+                           units: str = "metric") -> Dict[str, Tuple[Optional[Dict], Optional[Dict]]]:
+        """
+        Fetch current weather and forecast for many cities concurrently
+
+        Args:
+            cities: City names
+            units: Temperature units (metric, imperial, kelvin)
+
+        Returns:
+            Dictionary mapping each city to its (current weather, forecast)
+        """
+        cities = list(dict.fromkeys(cities))
+        results = await asyncio.gather(
+            *(self.get_weather_and_forecast(city, units) for city in cities)
+        )
+        return dict(zip(cities, results))
+
+    def close(self):
+        """Shut down the worker pool"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from PIL import Image
+from .backgrounds import get_file_hash
+from .config import BACKGROUNDS_DIR, BACKGROUND_MANIFEST_FILE
+from .disk_cache import atomic_write_bytes
+
+MANIFEST_VERSION = 1
+
+SUPPORTED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+
+# File name keywords for each weather category, most specific first
+BACKGROUND_MAPPINGS = {
+    'clear_day': ['sunny', 'clear_day', 'sunshine', 'clear', 'day'],
+    'clear_night': ['clear_night', 'starry_night', 'night_clear', 'night', 'stars'],
+    'clouds': ['cloudy', 'overcast', 'clouds', 'cloud'],
+    'rain': ['rainy', 'rain', 'storm', 'raining'],
+    'snow': ['snowy', 'snow', 'winter', 'snowing'],
+    'thunderstorm': ['thunderstorm', 'storm', 'lightning', 'thunder'],
+    'drizzle': ['drizzle', 'light_rain', 'misty', 'mist'],
+    'mist': ['misty', 'fog', 'hazy', 'mist'],
+    'fog': ['fog', 'misty', 'hazy', 'foggy'],
+    'default': ['default', 'sky', 'landscape', 'background']
+}
+
+# Categories given the first image when no file name matches a keyword
+FALLBACK_CATEGORIES = ['default', 'clear_day', 'clouds', 'rain', 'snow']
+
+def find_backgrounds_dir() -> Optional[str]:
+    """First existing backgrounds directory, relative to the working directory or the package"""
+    possible_paths = [
+        "assets/backgrounds",
+        "backgrounds",
+        str(BACKGROUNDS_DIR)
+    ]
+    for path in possible_paths:
+        if os.path.isdir(path):
+            return path
+    return None
+
+def map_backgrounds(names: List[str]) -> Dict[str, str]:
+    """
+    Assign image file names to weather categories by keyword
+
+    Args:
+        names: Image file names, in order of preference
+
+    Returns:
+        Dictionary of category -> file name
+    """
+    lowered = [(name, name.lower()) for name in names]
+    mapping = {}
+    for category, keywords in BACKGROUND_MAPPINGS.items():
+        for keyword in keywords:
+            match = next((name for name, lower in lowered if keyword in lower), None)
+            if match is not None:
+                mapping[category] = match
+                break
+
+    if not mapping and names:
+        mapping = {category: names[0] for category in FALLBACK_CATEGORIES}
+    return mapping
+
+class BackgroundLibrary:
+    """
+    Background images of a directory, described by a persistent manifest
+
+    The manifest records, for every image, its size, modification time,
+    dimensions and content hash, plus the weather category mapping. It is
+    trusted as long as the directory's modification time is unchanged, so
+    a normal start costs one stat() and one small file read. When files
+    are added, removed or renamed the directory is rescanned, and only new
+    or modified images are opened and hashed.
+    """
+
+    def __init__(self, directory: str, manifest_path: Path = BACKGROUND_MANIFEST_FILE):
+        """
+        Args:
+            directory: Directory holding background images
+            manifest_path: JSON manifest file
+        """
+        self.directory = os.path.abspath(directory)
+        self.manifest_path = Path(manifest_path)
+        self._lock = threading.Lock()
+        self._manifest = None
+
+        self.rescans = 0
+        self.images_opened = 0
+
+    def _read_manifest(self) -> Optional[Dict]:
+        """Load the manifest file if it describes this directory"""
+        try:
+            with open(self.manifest_path, 'rb') as f:
+                manifest = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("directory") != self.directory:
+            return None
+        return manifest
+
+    def _scan(self, previous: Optional[Dict], directory_mtime: int) -> Dict:
+        """Rescan the directory, reusing entries of unchanged files"""
+        old_files = previous["files"] if previous else {}
+        old_invalid = previous["invalid"] if previous else {}
+        files = {}
+        invalid = {}  # unreadable images, not retried until they change
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError as e:
+            print(f"Error reading backgrounds directory: {e}")
+            names = []
+
+        for name in names:
+            if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            entry = old_files.get(name)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                files[name] = entry
+                continue
+            stamp = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+            if old_invalid.get(name) == stamp:
+                invalid[name] = stamp
+                continue
+
+            # Opening reads only the header
+            try:
+                with Image.open(path) as image:
+                    width, height = image.size
+                content_hash = get_file_hash(path)
+            except Exception as e:
+                print(f"Error testing image {path}: {e}")
+                invalid[name] = stamp
+                continue
+            self.images_opened += 1
+            files[name] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "width": width,
+                "height": height,
+                "hash": content_hash
+            }
+
+        self.rescans += 1
+        return {
+            "version": MANIFEST_VERSION,
+            "directory": self.directory,
+            "mtime_ns": directory_mtime,
+            "files": files,
+            "invalid": invalid,
+            "mapping": map_backgrounds(list(files))
+        }
+
+    def load(self) -> Dict:
+        """
+        Get the manifest, rescanning the directory if it changed
+
+        Returns:
+            Manifest dictionary ("files": name -> entry, "mapping":
+            category -> name)
+        """
+        with self._lock:
+            try:
+                directory_mtime = os.stat(self.directory).st_mtime_ns
+            except OSError:
+                self._manifest = None
+                return {"files": {}, "invalid": {}, "mapping": {}}
+
+            manifest = self._manifest or self._read_manifest()
+            if manifest is None or manifest["mtime_ns"] != directory_mtime:
+                manifest = self._scan(manifest, directory_mtime)
+                payload = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+                try:
+                    atomic_write_bytes(self.manifest_path, payload)
+                except OSError as e:
+                    print(f"Error writing background manifest: {e}")
+            self._manifest = manifest
+            return manifest
+
+    def get_backgrounds(self) -> Dict[str, str]:
+        """Get the image path for each weather category that has one"""
+        manifest = self.load()
+        return {category: os.path.join(self.directory, name)
+                for category, name in manifest["mapping"].items()}
+
+    def get_files(self) -> Dict[str, Dict]:
+        """Get manifest entries by image path"""
+        manifest = self.load()
+        return {os.path.join(self.directory, name): entry
+                for name, entry in manifest["files"].items()}
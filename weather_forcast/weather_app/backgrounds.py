@@ -0,0 +1,345 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Hashable, Optional, Tuple, Union
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter
+from .config import (GLASS_BLUR_RADIUS, GLASS_BRIGHTNESS, GLASS_FAST_BLUR, BACKGROUND_CACHE_ENTRIES,
+                     BACKGROUND_CACHE_DIR, BACKGROUND_DISK_CACHE_BYTES)
+from .disk_cache import atomic_write_bytes
+from .lru_cache import LRUCache
+from .utils import open_image_reduced
+
+# Blur radius kept after downscaling in fast mode; smaller radii start to
+# show the upscaling
+FAST_BLUR_MIN_RADIUS = 6
+FAST_BLUR_MAX_SCALE = 8
+
+# Bump when rendering changes so renders cached on disk are not reused
+RENDER_VERSION = 2
+
+def get_blur_scale(blur_radius: float) -> int:
+    """Downscale factor for blurring at reduced resolution (1 for no downscaling)"""
+    return max(1, min(FAST_BLUR_MAX_SCALE, int(blur_radius / FAST_BLUR_MIN_RADIUS)))
+
+def fit_to_size(image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """Resize an image to cover size and center crop the overflow"""
+    width, height = size
+    image_ratio = image.width / image.height
+    window_ratio = width / height
+
+    if image_ratio > window_ratio:
+        new_height = height
+        new_width = int(height * image_ratio)
+    else:
+        new_width = width
+        new_height = int(width / image_ratio)
+
+    image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+
+    # Center crop
+    if new_width > width:
+        left = (new_width - width) // 2
+        image = image.crop((left, 0, left + width, new_height))
+    elif new_height > height:
+        top = (new_height - height) // 2
+        image = image.crop((0, top, new_width, top + height))
+    return image
+
+def render_glass_background(image_path: str, size: Tuple[int, int],
+                            blur_radius: float = GLASS_BLUR_RADIUS,
+                            brightness: float = GLASS_BRIGHTNESS,
+                            fast: bool = GLASS_FAST_BLUR) -> Image.Image:
+    """
+    Render a background with glass effect (high blur, darkened)
+
+    In fast mode the image is fitted and blurred at a resolution reduced
+    by get_blur_scale(blur_radius), then upscaled. A blur this strong leaves
+    no detail the upscaling could lose.
+
+    Args:
+        image_path: Source image
+        size: Target (width, height)
+        blur_radius: Gaussian blur radius
+        brightness: Brightness factor (0.4 keeps 40% of the original)
+        fast: Blur at reduced resolution
+
+    Returns:
+        Image of the given size
+    """
+    scale = get_blur_scale(blur_radius) if fast else 1
+    work_size = (-(-size[0] // scale), -(-size[1] // scale))
+
+    # Large photos are decoded at reduced scale close to the work size
+    source = open_image_reduced(image_path, work_size, cover=True)
+    if source.mode not in ("RGB", "RGBA"):
+        source = source.convert("RGB")
+    image = fit_to_size(source, work_size)
+
+    # Apply heavy blur for glass effect
+    blurred = image.filter(ImageFilter.GaussianBlur(radius=blur_radius / scale))
+    if scale > 1:
+        blurred = blurred.resize(size, Image.Resampling.BICUBIC)
+
+    # Darken the image significantly for better contrast
+    return ImageEnhance.Brightness(blurred).enhance(brightness)
+
+class GradientBackground:
+    """
+    Vertical two-colour gradient used when no background images are found
+
+    Generated in memory at the window size, so it needs no file and works
+    anywhere an image path is accepted as a background source.
+    """
+
+    __slots__ = ("top", "bottom")
+
+    def __init__(self, top: Tuple[int, int, int] = (74, 144, 226),
+                 bottom: Tuple[int, int, int] = (144, 102, 185)):
+        """
+        Args:
+            top: RGB colour of the top row
+            bottom: RGB colour the gradient approaches at the bottom row
+        """
+        self.top = tuple(top)
+        self.bottom = tuple(bottom)
+
+    def get_key(self) -> Tuple:
+        """Identity of the gradient for render caches"""
+        return ("gradient", self.top, self.bottom)
+
+    def render(self, size: Tuple[int, int], brightness: float = 1.0) -> Image.Image:
+        """
+        Render the gradient, darkened by brightness, at size
+
+        One column is computed with NumPy and stretched sideways, so the
+        cost hardly depends on the window width.
+        """
+        width, height = max(1, size[0]), max(1, size[1])
+        column = np.linspace(self.top, self.bottom, height, endpoint=False) * brightness
+        strip = Image.fromarray(column.astype(np.uint8).reshape(height, 1, 3))
+        return strip.resize((width, height), Image.Resampling.NEAREST)
+
+# A background is an image path or a generated gradient
+BackgroundSource = Union[str, GradientBackground]
+
+def get_file_hash(path: str) -> str:
+    """SHA-1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class RenderDiskCache:
+    """
+    Rendered backgrounds stored as PNG files, bounded by total size
+
+    Files are named by a hash of the source contents, target size and
+    effect parameters, so a renamed or touched source still hits while an
+    edited one renders again. A hit refreshes the file modification time,
+    and the least recently used files are deleted once the directory grows
+    past max_bytes.
+    """
+
+    def __init__(self, directory: Path = BACKGROUND_CACHE_DIR, max_bytes: int = BACKGROUND_DISK_CACHE_BYTES):
+        """
+        Args:
+            directory: Directory holding rendered backgrounds
+            max_bytes: Maximum total size of the files kept
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # Source hashes by (path, mtime, size), so a source is read only
+        # once per change rather than on every lookup
+        self._hashes: Dict[Tuple, str] = {}
+        self._lock = threading.Lock()
+
+    def add_source_hash(self, image_path: str, mtime_ns: int, size: int, digest: str):
+        """Remember a source's content hash computed elsewhere (e.g. a manifest)"""
+        with self._lock:
+            self._hashes[(os.path.abspath(image_path), mtime_ns, size)] = digest
+
+    def get_source_hash(self, image_path: str) -> Optional[str]:
+        """Content hash of a source image, or None if it cannot be read"""
+        try:
+            stat = os.stat(image_path)
+            file_id = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+            with self._lock:
+                digest = self._hashes.get(file_id)
+            if digest is None:
+                digest = get_file_hash(image_path)
+                with self._lock:
+                    self._hashes[file_id] = digest
+            return digest
+        except OSError:
+            return None
+
+    def _get_path(self, source_hash: str, size: Tuple[int, int], params: Tuple) -> Path:
+        """Map a render to its file path"""
+        key = f"{RENDER_VERSION}:{source_hash}:{size[0]}x{size[1]}:{params!r}"
+        return self.directory / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.png"
+
+    def get(self, source_hash: str, size: Tuple[int, int], params: Tuple) -> Optional[Image.Image]:
+        """Load a cached render, or None if missing or unreadable"""
+        path = self._get_path(source_hash, size, params)
+        try:
+            with Image.open(path) as cached:
+                cached.load()
+                image = cached
+            if image.size != tuple(size):
+                return None
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return image
+
+    def set(self, source_hash: str, size: Tuple[int, int], params: Tuple, image: Image.Image):
+        """Store a render, then evict old files if over the size limit"""
+        buffer = io.BytesIO()
+        # Low compression: blurred images compress well anyway, and
+        # encoding stays cheap next to the render itself
+        image.save(buffer, "PNG", compress_level=1)
+        try:
+            atomic_write_bytes(self._get_path(source_hash, size, params), buffer.getvalue())
+            self._evict()
+        except OSError as e:
+            print(f"Error writing background cache: {e}")
+
+    def _evict(self):
+        """Delete least recently used files until within max_bytes"""
+        files = []
+        for path in self.directory.glob("*.png"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove every cached render"""
+        for path in self.directory.glob("*.png"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+class BackgroundRenderer:
+    """
+    Render glass backgrounds, memoizing results
+
+    Renders are keyed by source path, modification time and file size,
+    target size and effect parameters, so an edited source or a new window
+    size renders again while repeated refreshes cost only a lookup. With a
+    disk cache, renders also persist across launches, and a warm start
+    decodes one pre-sized file instead of blurring the source.
+    """
+
+    def __init__(self, max_entries: int = BACKGROUND_CACHE_ENTRIES,
+                 blur_radius: float = GLASS_BLUR_RADIUS, brightness: float = GLASS_BRIGHTNESS,
+                 fast: bool = GLASS_FAST_BLUR, disk_cache: Optional[RenderDiskCache] = None):
+        """
+        Args:
+            max_entries: Rendered backgrounds kept in memory
+            blur_radius: Gaussian blur radius
+            brightness: Brightness factor
+            fast: Blur at reduced resolution (see render_glass_background)
+            disk_cache: Persistent store for renders (None to keep them in memory only)
+        """
+        self.blur_radius = blur_radius
+        self.brightness = brightness
+        self.fast = fast
+        self.cache = LRUCache(max_entries=max_entries)
+        self.disk_cache = disk_cache
+
+        self._stats_lock = threading.Lock()
+        self._renders = 0
+        self._disk_hits = 0
+        self._render_time = 0.0
+
+    def get_key(self, source: BackgroundSource, size: Tuple[int, int]) -> Optional[Hashable]:
+        """Cache key for rendering a source at size, or None if the file is missing"""
+        if isinstance(source, GradientBackground):
+            return source.get_key() + (tuple(size), self.brightness)
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return None
+        return (os.path.abspath(source), stat.st_mtime_ns, stat.st_size,
+                tuple(size), self.blur_radius, self.brightness, self.fast)
+
+    def get_cached(self, source: BackgroundSource, size: Tuple[int, int]) -> Tuple[Optional[Hashable], Optional[Image.Image]]:
+        """Get an already rendered background without rendering, (key, None) on a miss"""
+        key = self.get_key(source, size)
+        return key, self.cache.get(key) if key is not None else None
+
+    def render(self, source: BackgroundSource, size: Tuple[int, int]) -> Tuple[Optional[Hashable], Optional[Image.Image]]:
+        """
+        Get the glass background for an image or gradient at a window size
+
+        Returns:
+            Tuple of (cache key, image), (None, None) if the source is missing
+
+        Raises:
+            OSError: If the source cannot be decoded
+        """
+        key = self.get_key(source, size)
+        if key is None:
+            return None, None
+
+        image = self.cache.get(key)
+        if image is None:
+            image = self._render(source, tuple(size))
+            self.cache.set(key, image)
+        return key, image
+
+    def _render(self, source: BackgroundSource, size: Tuple[int, int]) -> Image.Image:
+        """Load a render from the disk cache, or render and store it"""
+        if isinstance(source, GradientBackground):
+            # Blurring a smooth gradient changes nothing, so only darken it
+            return source.render(size, self.brightness)
+
+        image_path = source
+        params = (self.blur_radius, self.brightness, self.fast)
+        source_hash = self.disk_cache.get_source_hash(image_path) if self.disk_cache else None
+        if source_hash is not None:
+            image = self.disk_cache.get(source_hash, size, params)
+            if image is not None:
+                with self._stats_lock:
+                    self._disk_hits += 1
+                return image
+
+        start = time.perf_counter()
+        image = render_glass_background(image_path, size, self.blur_radius, self.brightness, self.fast)
+        with self._stats_lock:
+            self._renders += 1
+            self._render_time += time.perf_counter() - start
+        if source_hash is not None:
+            self.disk_cache.set(source_hash, size, params, image)
+        return image
+
+    def get_stats(self) -> Dict:
+        """Get render cache statistics, with disk hits and render counts"""
+        stats = self.cache.get_stats()
+        with self._stats_lock:
+            stats.update({
+                "disk_hits": self._disk_hits,
+                "renders": self._renders,
+                "render_time": self._render_time
+            })
+        return stats
@@ -0,0 +1,329 @@
+import heapq
+import json
+import os
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from .config import CITY_LIST_FILE, CITY_INDEX_FILE
+from .disk_cache import atomic_write_bytes
+
+INDEX_MAGIC = b"WCIDX1\n"
+
+# Prefixes up to this length get a precomputed top-N list, since their key
+# ranges are too wide to rank per keystroke
+PRECOMPUTED_PREFIX_LENGTH = 2
+PRECOMPUTED_RESULTS = 10
+
+# Shortest name the fuzzy matcher tries to correct
+FUZZY_MIN_LENGTH = 3
+
+def fold_name(name: str) -> str:
+    """Lowercase a name and strip accents so "München" matches "munchen\""""
+    decomposed = unicodedata.normalize("NFKD", name.lower().replace("ß", "ss"))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).strip()
+
+def get_trigrams(key: str) -> set:
+    """Padded character trigrams of a folded name ("lyon" -> "  l", " ly", ...)"""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Edit distance counting adjacent transpositions as one edit
+
+    Returns:
+        The distance, or max_distance + 1 once it is known to be larger
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+def _read_city_rows(source_path: Path) -> Iterator[Tuple[str, List[str], str, int, float, float]]:
+    """
+    Stream (name, search names, country, population, lat, lon) rows from a city list
+
+    Accepts the bundled format (name, ascii_name, alternate_names, country,
+    population, lat, lon) and GeoNames "cities*.txt" dumps, both tab separated.
+    """
+    with open(source_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            try:
+                if len(fields) >= 15:
+                    # GeoNames: id, name, asciiname, alternatenames, lat, lon, ...
+                    name, ascii_name, alternates = fields[1], fields[2], fields[3]
+                    lat, lon = float(fields[4]), float(fields[5])
+                    country, population = fields[8], int(fields[14] or 0)
+                else:
+                    name, ascii_name, alternates, country = fields[:4]
+                    population = int(fields[4] or 0)
+                    lat, lon = float(fields[5]), float(fields[6])
+            except (ValueError, IndexError):
+                continue
+            names = [name, ascii_name] + [alt for alt in alternates.split(",") if alt]
+            yield name, names, country, population, lat, lon
+
+def build_city_index(source_path: Path = CITY_LIST_FILE, index_path: Path = CITY_INDEX_FILE) -> int:
+    """
+    Build the binary prefix index from a city list file
+
+    Records are stored in descending population order, so a record's
+    position is its rank and ranking a key range only needs the smallest ids.
+
+    Returns:
+        Number of cities indexed
+    """
+    rows = []
+    for name, names, country, population, lat, lon in _read_city_rows(source_path):
+        rows.append((population, name, names, country, lat, lon))
+    rows.sort(key=lambda row: -row[0])
+
+    keys = {}
+    for record_id, (_, _, names, _, _, _) in enumerate(rows):
+        for search_name in names:
+            key = fold_name(search_name)
+            if key:
+                keys.setdefault((key, record_id), None)
+    sorted_keys = sorted(keys)
+
+    # Precomputed rankings for short prefixes
+    top = {}
+    for key, record_id in sorted_keys:
+        for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+            if len(key) >= length:
+                ids = top.setdefault(key[:length], [])
+                if record_id not in ids:
+                    ids.append(record_id)
+    top = {prefix: sorted(ids)[:PRECOMPUTED_RESULTS] for prefix, ids in top.items()}
+
+    sections = [
+        ("keys", "\n".join(key for key, _ in sorted_keys).encode("utf-8")),
+        ("key_records", array("I", (record_id for _, record_id in sorted_keys)).tobytes()),
+        ("names", "\n".join(row[1] for row in rows).encode("utf-8")),
+        ("countries", "".join(f"{row[3][:2]:<2}" for row in rows).encode("ascii", "replace")),
+        ("population", array("I", (min(row[0], 2 ** 32 - 1) for row in rows)).tobytes()),
+        ("lat", array("f", (row[4] for row in rows)).tobytes()),
+        ("lon", array("f", (row[5] for row in rows)).tobytes())
+    ]
+    header = {
+        "cities": len(rows),
+        "keys": len(sorted_keys),
+        "sections": [[name, len(data)] for name, data in sections],
+        "top": top
+    }
+
+    payload = [INDEX_MAGIC, json.dumps(header, separators=(",", ":")).encode("utf-8"), b"\n"]
+    payload.extend(data for _, data in sections)
+    index_path = Path(index_path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_bytes(index_path, b"".join(payload))
+    return len(rows)
+
+class CityIndex:
+    """
+    Offline city prefix index for autocomplete
+
+    The index file is built from the bundled city list on first use (and
+    rebuilt when the list changes), then loaded lazily into flat arrays.
+    """
+
+    def __init__(self, index_path: Path = CITY_INDEX_FILE, source_path: Optional[Path] = CITY_LIST_FILE):
+        """
+        Args:
+            index_path: Binary index file
+            source_path: City list the index is built from (None to never rebuild)
+        """
+        self.index_path = Path(index_path)
+        self.source_path = Path(source_path) if source_path is not None else None
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._trigrams = None  # trigram -> key positions, built on first fuzzy search
+
+    def _needs_build(self) -> bool:
+        """Check if the index file is missing or older than the city list"""
+        if self.source_path is None or not self.source_path.exists():
+            return False
+        try:
+            return os.stat(self.index_path).st_mtime < os.stat(self.source_path).st_mtime
+        except OSError:
+            return True
+
+    def _load(self):
+        """Build if needed and load the index on first use"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self._needs_build():
+                build_city_index(self.source_path, self.index_path)
+
+            self.keys = []
+            self.top = {}
+            try:
+                with open(self.index_path, 'rb') as f:
+                    data = f.read()
+                if not data.startswith(INDEX_MAGIC):
+                    raise ValueError("not a city index file")
+                header_end = data.index(b"\n", len(INDEX_MAGIC))
+                header = json.loads(data[len(INDEX_MAGIC):header_end])
+            except (OSError, ValueError) as e:
+                print(f"Error loading city index: {e}")
+                self._loaded = True
+                return
+
+            sections = {}
+            offset = header_end + 1
+            for name, length in header["sections"]:
+                sections[name] = data[offset:offset + length]
+                offset += length
+
+            self.keys = sections["keys"].decode("utf-8").split("\n") if header["keys"] else []
+            self.key_records = array("I")
+            self.key_records.frombytes(sections["key_records"])
+            self.names = sections["names"].decode("utf-8").split("\n")
+            self.countries = sections["countries"].decode("ascii")
+            self.population = array("I")
+            self.population.frombytes(sections["population"])
+            self.lat = array("f")
+            self.lat.frombytes(sections["lat"])
+            self.lon = array("f")
+            self.lon.frombytes(sections["lon"])
+            self.top = header["top"]
+            self._loaded = True
+
+    def __len__(self) -> int:
+        self._load()
+        return len(self.names) if self.keys else 0
+
+    def get_city(self, record_id: int) -> Dict:
+        """Get the city stored at record_id"""
+        self._load()
+        return {
+            "name": self.names[record_id],
+            "country": self.countries[record_id * 2:record_id * 2 + 2].strip(),
+            "lat": round(self.lat[record_id], 4),
+            "lon": round(self.lon[record_id], 4),
+            "population": self.population[record_id]
+        }
+
+    def _prefix_ids(self, prefix: str, limit: int, country: str = "") -> List[int]:
+        """Get record ids of the most populous cities with a name starting with prefix"""
+        if not country and len(prefix) <= PRECOMPUTED_PREFIX_LENGTH and prefix in self.top:
+            return self.top[prefix][:limit]
+
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + "\uffff", start)
+        ids = set(self.key_records[start:end])
+        if country:
+            ids = {record_id for record_id in ids
+                   if self.countries[record_id * 2:record_id * 2 + 2].lower().startswith(country)}
+        return heapq.nsmallest(limit, ids)
+
+    def prefix_search(self, query: str, limit: int = 8) -> List[Dict]:
+        """
+        Find cities whose name starts with query, most populous first
+
+        A trailing ", <country code>" narrows results to that country.
+
+        Returns:
+            List of city dictionaries ("name", "country", "lat", "lon", "population")
+        """
+        self._load()
+        if not self.keys:
+            return []
+
+        name, _, country = query.partition(",")
+        prefix = fold_name(name)
+        if not prefix:
+            return []
+        return [self.get_city(record_id)
+                for record_id in self._prefix_ids(prefix, limit, fold_name(country))]
+
+    def contains(self, name: str) -> bool:
+        """Check if a name (or alternate name) exactly matches an indexed city"""
+        self._load()
+        key = fold_name(name.partition(",")[0])
+        position = bisect_left(self.keys, key)
+        return position < len(self.keys) and self.keys[position] == key
+
+    def _get_trigrams(self) -> Dict[str, List[int]]:
+        """Build the trigram postings for the keys on first use"""
+        if self._trigrams is None:
+            with self._lock:
+                if self._trigrams is None:
+                    postings = {}
+                    for position, key in enumerate(self.keys):
+                        for trigram in get_trigrams(key):
+                            postings.setdefault(trigram, []).append(position)
+                    self._trigrams = postings
+        return self._trigrams
+
+    def fuzzy_search(self, query: str, limit: int = 5, max_distance: Optional[int] = None) -> List[Dict]:
+        """
+        Find cities whose name is close to a possibly misspelled query
+
+        Candidates sharing enough trigrams with the query are ranked by edit
+        distance, then by population, so "Lodnon" suggests London.
+
+        Args:
+            query: City name, optionally followed by ", <country code>"
+            limit: Maximum number of results
+            max_distance: Largest edit distance accepted (by default 1 for
+                names up to 5 characters, 2 for longer ones)
+
+        Returns:
+            List of city dictionaries with an added "distance"
+        """
+        self._load()
+        name, _, country = query.partition(",")
+        key, country = fold_name(name), fold_name(country)
+        if not self.keys or len(key) < FUZZY_MIN_LENGTH:
+            return []
+        if max_distance is None:
+            max_distance = 1 if len(key) <= 5 else 2
+
+        # Each edit (or swap of adjacent letters) changes at most four trigrams
+        query_trigrams = get_trigrams(key)
+        min_shared = max(1, len(query_trigrams) - 4 * max_distance)
+        postings = self._get_trigrams()
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(postings.get(trigram, ()))
+
+        best = {}
+        for position, count in shared.items():
+            if count < min_shared:
+                continue
+            record_id = self.key_records[position]
+            if country and not self.countries[record_id * 2:record_id * 2 + 2].lower().startswith(country):
+                continue
+            distance = edit_distance(key, self.keys[position], max_distance)
+            if distance <= max_distance and distance < best.get(record_id, max_distance + 1):
+                best[record_id] = distance
+
+        ranked = sorted(best, key=lambda record_id: (best[record_id], record_id))[:limit]
+        return [dict(self.get_city(record_id), distance=best[record_id]) for record_id in ranked]
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict]:
+        """Prefix matches for a query, falling back to typo corrections"""
+        return self.prefix_search(query, limit) or self.fuzzy_search(query, limit)
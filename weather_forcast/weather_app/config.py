@@ -7,6 +7,7 @@ from pathlib import Path
 OPENWEATHER_API_KEY = "paste_your_api_key"  # Get from https://openweathermap.org/api
 OPENWEATHER_BASE_URL = "http://api.openweathermap.org/data/2.5/"
 OPENWEATHER_ICON_URL = "http://openweathermap.org/img/wn/"
+OPENWEATHER_GEO_URL = "http://api.openweathermap.org/geo/1.0/"
 
 # App Configuration
 APP_NAME = "Weather forcast"
@@ -22,6 +23,9 @@ ASSETS_DIR = BASE_DIR / "assets"
 ICONS_DIR = ASSETS_DIR / "icons"
 BACKGROUNDS_DIR = ASSETS_DIR / "backgrounds"
 CACHE_DIR = BASE_DIR / "cache"
+DATA_DIR = ASSETS_DIR / "data"
+CITY_LIST_FILE = DATA_DIR / "cities.tsv"
+CITY_INDEX_FILE = CACHE_DIR / "city_index.bin"
 
 # Create directories if they don't exist
 for directory in [ASSETS_DIR, ICONS_DIR, BACKGROUNDS_DIR, CACHE_DIR]:
@@ -82,3 +86,42 @@ DEFAULT_CITY = "London"
 DEFAULT_UNITS = "metric"  # metric, imperial, kelvin
 REFRESH_INTERVAL = 300000  # 5 minutes in milliseconds
 CACHE_DURATION = 600  # 10 minutes in seconds
+CACHE_MAX_ENTRIES = 500  # in-memory API responses kept
+CACHE_MAX_BYTES = 32 * 1024 * 1024  # approximate in-memory cache budget
+CACHE_PURGE_INTERVAL = 60  # seconds between expired-entry sweeps
+STALE_CACHE_DURATION = 6 * 3600  # how long expired data may still be served
+STALE_WHILE_REVALIDATE = False  # return expired data at once and refresh it in the background
+SERVE_STALE_ON_ERROR = True  # fall back to expired data when the API is unreachable
+
+# HTTP connection pool settings
+REQUEST_TIMEOUT = 10  # seconds
+HTTP_POOL_CONNECTIONS = 4  # number of hosts to keep pools for
+HTTP_POOL_MAXSIZE = 10  # connections kept alive per host
+HTTP_POOL_BLOCK = False  # wait for a free connection instead of opening extras
+HTTP_KEEP_ALIVE = True
+MAX_CONCURRENT_REQUESTS = 8  # parallel API calls for concurrent fetches
+
+# Client-side rate limiting (free OpenWeatherMap plan allows 60 calls/minute)
+RATE_LIMIT_PER_MINUTE = 60
+RATE_LIMIT_BURST = 10  # calls allowed back to back before throttling
+RATE_LIMIT_MAX_WAIT = 30  # seconds a request may queue before giving up
+
+# Retries and circuit breaker for transient API errors
+RETRY_MAX_RETRIES = 2  # retries after the first attempt
+RETRY_BACKOFF_BASE = 0.5  # seconds, doubled on each retry (with jitter)
+RETRY_BACKOFF_MAX = 8  # longest single retry delay in seconds
+CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive failures before failing fast
+CIRCUIT_RECOVERY_TIMEOUT = 30  # seconds before probing the API again
+
+# Glass background rendering
+GLASS_BLUR_RADIUS = 25
+GLASS_BRIGHTNESS = 0.4  # fraction of the original brightness kept
+GLASS_FAST_BLUR = True  # blur at reduced resolution and upscale
+BACKGROUND_CACHE_ENTRIES = 8  # rendered backgrounds kept in memory
+BACKGROUND_CACHE_DIR = CACHE_DIR / "backgrounds"
+BACKGROUND_DISK_CACHE_BYTES = 64 * 1024 * 1024  # rendered backgrounds kept on disk
+BACKGROUND_MANIFEST_FILE = CACHE_DIR / "backgrounds.json"  # background images and their categories
+
+# Search suggestions
+SUGGEST_MIN_CHARS = 2  # shortest query that gets suggestions
+SUGGEST_DEBOUNCE_MS = 300  # typing pause before asking the API for suggestions
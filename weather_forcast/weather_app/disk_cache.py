@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+from .config import CACHE_DIR, CACHE_DURATION
+
+def atomic_write_bytes(path: Path, payload: bytes, mtime: Optional[float] = None):
+    """
+    Write a file atomically (temp file in the same directory, then rename)
+
+    Args:
+        path: Destination file
+        payload: File contents
+        mtime: Optional modification time to stamp on the file
+    """
+    fd, temp_path = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        if mtime is not None:
+            os.utime(temp_path, (mtime, mtime))
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+class DiskCache:
+    """
+    Persistent JSON cache with one file per key
+
+    The file modification time records when the entry was stored, so expired
+    entries are rejected with a single stat() call before any file is read.
+    """
+
+    def __init__(self, directory: Path = CACHE_DIR / "responses", ttl: float = CACHE_DURATION):
+        """
+        Args:
+            directory: Directory holding cache files
+            ttl: Seconds an entry stays valid
+        """
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _get_path(self, key: str) -> Path:
+        """Map a cache key to its file path"""
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Tuple[Any, float]]:
+        """
+        Look up a cache entry
+
+        Args:
+            key: Cache key
+            max_age: Accept entries up to this many seconds old instead of the TTL
+
+        Returns:
+            Tuple of (data, timestamp) or None if missing, expired or unreadable
+        """
+        if max_age is None:
+            max_age = self.ttl
+        path = self._get_path(key)
+        try:
+            timestamp = os.stat(path).st_mtime
+            if time.time() - timestamp >= max_age:
+                return None
+            with open(path, 'rb') as f:
+                entry = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+        # Guard against hash collisions
+        if entry.get("key") != key:
+            return None
+        return entry["data"], timestamp
+
+    def set(self, key: str, data: Any, timestamp: Optional[float] = None):
+        """Store data under key, stamped with timestamp (defaults to now)"""
+        if timestamp is None:
+            timestamp = time.time()
+        payload = json.dumps({"key": key, "data": data}, separators=(",", ":")).encode("utf-8")
+        try:
+            atomic_write_bytes(self._get_path(key), payload, mtime=timestamp)
+        except OSError as e:
+            print(f"Error writing cache entry: {e}")
+
+    def delete(self, key: str):
+        """Remove a cache entry if present"""
+        try:
+            os.unlink(self._get_path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove every cache entry"""
+        for path in self.directory.glob("*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,261 @@
+import calendar
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+
+# Weekday abbreviations, Monday first (day 0 of the epoch was a Thursday)
+WEEKDAY_NAMES = tuple(calendar.day_abbr)
+
+def get_local_utc_offset(timestamp: float) -> int:
+    """UTC offset in seconds of this computer's timezone at timestamp"""
+    return int(datetime.fromtimestamp(timestamp).astimezone().utcoffset().total_seconds())
+
+def get_utc_offset(data: Optional[Dict]) -> Optional[int]:
+    """UTC offset in seconds of the city a current or forecast payload is for"""
+    if not data:
+        return None
+    offset = data.get("timezone", (data.get("city") or {}).get("timezone"))
+    return int(offset) if isinstance(offset, (int, float)) else None
+
+def get_day_number(timestamp: float, utc_offset: int = 0) -> int:
+    """Days since the epoch of a timestamp in a timezone given as a UTC offset"""
+    return int(timestamp + utc_offset) // SECONDS_PER_DAY
+
+def get_weekday(day: int) -> int:
+    """Weekday of a day number, Monday being 0"""
+    return (day + 3) % 7
+
+@lru_cache(maxsize=128)
+def get_day_label(day: int, today: Optional[int] = None) -> str:
+    """
+    Card label for a day number: "Today", "Tomorrow" or the weekday
+
+    Args:
+        day: Day number in the city's timezone
+        today: Current day number in the same timezone (None for weekdays only)
+    """
+    if today is not None:
+        if day == today:
+            return "Today"
+        if day == today + 1:
+            return "Tomorrow"
+    return WEEKDAY_NAMES[get_weekday(day)]
+
+class StringTable:
+    """Interns repeated strings as small integer codes"""
+
+    __slots__ = ("_codes", "_values", "_lock")
+
+    def __init__(self):
+        self._codes = {}
+        self._values = []
+        self._lock = threading.Lock()
+
+    def code(self, value: str) -> int:
+        """Get the code of a string, adding it if new"""
+        code = self._codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(value)
+                if code is None:
+                    code = len(self._values)
+                    self._values.append(value)
+                    self._codes[value] = code
+        return code
+
+    def value(self, code: int) -> str:
+        """Get the string for a code"""
+        return self._values[code]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+# Condition strings shared by every Forecast ("Clouds", "light rain", "10d", ...)
+CONDITIONS = StringTable()
+DESCRIPTIONS = StringTable()
+ICONS = StringTable()
+
+class Forecast:
+    """
+    Parsed 5-day / 3-hour forecast for one city, stored column-wise
+
+    Each field of the 3-hour slots is a typed NumPy array. Condition,
+    description and icon strings are interned as uint16 codes, and fields
+    the app does not use are dropped.
+    """
+
+    __slots__ = ("name", "country", "utc_offset", "dt", "temp", "feels_like", "temp_min",
+                 "temp_max", "humidity", "pressure", "wind_speed", "wind_deg", "pop",
+                 "condition", "description", "icon")
+
+    def __init__(self, name: str = "", country: str = "", utc_offset: Optional[int] = None,
+                 items: Iterable[Dict] = ()):
+        """
+        Args:
+            name: City name
+            country: Country code
+            utc_offset: City timezone in seconds
+            items: 3-hour slots as in the API "list" field
+        """
+        self.name = name
+        self.country = country
+        self.utc_offset = utc_offset
+
+        columns = [[] for _ in range(13)]
+        (dt, temp, feels_like, temp_min, temp_max, humidity, pressure,
+         wind_speed, wind_deg, pop, condition, description, icon) = columns
+        for item in items:
+            main = item.get("main", {})
+            wind = item.get("wind", {})
+            weather = (item.get("weather") or [{}])[0]
+            dt.append(item["dt"])
+            temp.append(main.get("temp", np.nan))
+            feels_like.append(main.get("feels_like", np.nan))
+            temp_min.append(main.get("temp_min", np.nan))
+            temp_max.append(main.get("temp_max", np.nan))
+            humidity.append(main.get("humidity", 0))
+            pressure.append(main.get("pressure", 0))
+            wind_speed.append(wind.get("speed", 0.0))
+            wind_deg.append(wind.get("deg", 0))
+            pop.append(item.get("pop", 0.0))
+            condition.append(CONDITIONS.code(weather.get("main", "")))
+            description.append(DESCRIPTIONS.code(weather.get("description", "")))
+            icon.append(ICONS.code(weather.get("icon", "")))
+
+        self.dt = np.array(dt, dtype=np.int64)
+        self.temp = np.array(temp, dtype=np.float32)
+        self.feels_like = np.array(feels_like, dtype=np.float32)
+        self.temp_min = np.array(temp_min, dtype=np.float32)
+        self.temp_max = np.array(temp_max, dtype=np.float32)
+        self.humidity = np.array(humidity, dtype=np.uint8)
+        self.pressure = np.array(pressure, dtype=np.uint16)
+        self.wind_speed = np.array(wind_speed, dtype=np.float32)
+        self.wind_deg = np.array(wind_deg, dtype=np.uint16)
+        self.pop = np.array(pop, dtype=np.float32)
+        self.condition = np.array(condition, dtype=np.uint16)
+        self.description = np.array(description, dtype=np.uint16)
+        self.icon = np.array(icon, dtype=np.uint16)
+
+    @classmethod
+    def from_payload(cls, data: Optional[Dict]) -> "Forecast":
+        """Parse a forecast API payload (an empty Forecast for None)"""
+        data = data or {}
+        city = data.get("city") or {}
+        return cls(city.get("name", ""), city.get("country", ""), get_utc_offset(data),
+                   data.get("list", ()))
+
+    def __len__(self) -> int:
+        return len(self.dt)
+
+    def get_weather(self, index: int) -> Dict:
+        """Weather condition of a slot, as in the API "weather" entries"""
+        return {
+            "main": CONDITIONS.value(self.condition[index]),
+            "description": DESCRIPTIONS.value(self.description[index]),
+            "icon": ICONS.value(self.icon[index])
+        }
+
+def _group_modes(groups: np.ndarray, codes: np.ndarray, n_groups: int, n_codes: int) -> np.ndarray:
+    """
+    Most frequent code per group, ties going to the code that occurs first
+    in the group
+
+    groups must be sorted, with each group's slots in time order. Codes
+    are table positions, so their order says nothing about the slots.
+    """
+    cells = groups * n_codes + codes
+    counts = np.bincount(cells, minlength=n_groups * n_codes).reshape(n_groups, n_codes)
+
+    # Index of each (group, code)'s first slot; codes absent from a group
+    # never win since they are not tied for the maximum
+    seen, first_index = np.unique(cells, return_index=True)
+    first = np.full(n_groups * n_codes, len(cells), dtype=np.int64)
+    first[seen] = first_index
+    first = first.reshape(n_groups, n_codes)
+
+    tied = counts == counts.max(axis=1, keepdims=True)
+    return np.where(tied, first, len(cells)).argmin(axis=1)
+
+def summarize_forecasts(forecasts: Iterable, days: int = 5,
+                        utc_offset: Optional[int] = None) -> List[List[Dict]]:
+    """
+    Aggregate forecast payloads into daily summaries in one vectorized pass
+
+    Slots of every payload are bucketed by (payload, day) together, so a
+    batch of cities costs little more than a single one. Days are split at
+    midnight in each city's own timezone ("city.timezone" in the payload),
+    using integer arithmetic on the timestamps.
+
+    Args:
+        forecasts: Forecast objects or forecast payloads ("list" of 3-hour slots)
+        days: Maximum number of days per forecast
+        utc_offset: Seconds added to timestamps before splitting days, for
+            every forecast (by default the city's timezone, or this
+            computer's timezone if it is unknown)
+
+    Returns:
+        For each forecast, a list of day dictionaries ("day", "day_name",
+        "label", "temp_high", "temp_low", "condition", "icon", "description")
+    """
+    forecasts = [forecast if isinstance(forecast, Forecast) else Forecast.from_payload(forecast)
+                 for forecast in forecasts]
+    summaries = [[] for _ in forecasts]
+    lengths = [len(forecast) for forecast in forecasts]
+    if not sum(lengths):
+        return summaries
+
+    now = time.time()
+    offsets = []
+    for forecast in forecasts:
+        offset = utc_offset if utc_offset is not None else forecast.utc_offset
+        offsets.append(offset if offset is not None else get_local_utc_offset(now))
+    todays = [get_day_number(now, offset) for offset in offsets]
+
+    # Sort slots by (forecast, day) so every group is a contiguous run
+    owners = np.repeat(np.arange(len(forecasts), dtype=np.int64), lengths)
+    day_numbers = (np.concatenate([forecast.dt for forecast in forecasts])
+                   + np.repeat(np.array(offsets, dtype=np.int64), lengths)) // SECONDS_PER_DAY
+    keys = (owners << 32) | day_numbers
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    groups = np.cumsum(np.r_[0, keys[1:] != keys[:-1]])
+    n_groups = len(starts)
+
+    # Temperatures are stored as float32; round back to the API's precision
+    sorted_temps = np.concatenate([forecast.temp for forecast in forecasts])[order]
+    highs = np.round(np.maximum.reduceat(sorted_temps, starts).astype(np.float64), 2).tolist()
+    lows = np.round(np.minimum.reduceat(sorted_temps, starts).astype(np.float64), 2).tolist()
+
+    modes = []
+    for table, column in ((CONDITIONS, "condition"), (ICONS, "icon"), (DESCRIPTIONS, "description")):
+        codes = np.concatenate([getattr(forecast, column) for forecast in forecasts]).astype(np.int64)
+        mode_codes = _group_modes(groups, codes[order], n_groups, int(codes.max()) + 1)
+        modes.append([table.value(code) for code in mode_codes.tolist()])
+
+    group_owners = (keys[starts] >> 32).tolist()
+    group_days = (keys[starts] & 0xFFFFFFFF).tolist()
+    for group, owner in enumerate(group_owners):
+        if len(summaries[owner]) >= days:
+            continue
+        day = group_days[group]
+        summaries[owner].append({
+            "day": day,
+            "day_name": get_day_label(day),
+            "label": get_day_label(day, todays[owner]),
+            "temp_high": highs[group],
+            "temp_low": lows[group],
+            "condition": modes[0][group],
+            "icon": modes[1][group],
+            "description": modes[2][group]
+        })
+    return summaries
+
+def summarize_forecast(forecast, days: int = 5, utc_offset: Optional[int] = None) -> List[Dict]:
+    """Aggregate one Forecast or forecast payload into daily summaries (see summarize_forecasts)"""
+    return summarize_forecasts([forecast], days, utc_offset)[0]
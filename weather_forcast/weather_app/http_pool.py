@@ -0,0 +1,117 @@
+import threading
+from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from .config import (
+    REQUEST_TIMEOUT, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_POOL_BLOCK, HTTP_KEEP_ALIVE
+)
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTP adapter whose connection pools report every new socket connect"""
+
+    def __init__(self, on_connect, **kwargs):
+        self._on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        on_connect = self._on_connect
+
+        class CountingHTTPConnection(HTTPConnection):
+            def connect(self):
+                on_connect()
+                super().connect()
+
+        class CountingHTTPSConnection(HTTPSConnection):
+            def connect(self):
+                on_connect()
+                super().connect()
+
+        class CountingHTTPConnectionPool(HTTPConnectionPool):
+            ConnectionCls = CountingHTTPConnection
+
+        class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+            ConnectionCls = CountingHTTPSConnection
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool
+        }
+
+class PooledHTTPSession:
+    """Keep-alive HTTP session with a bounded connection pool and reuse counters"""
+
+    def __init__(self, pool_connections: int = HTTP_POOL_CONNECTIONS,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 pool_block: bool = HTTP_POOL_BLOCK,
+                 keep_alive: bool = HTTP_KEEP_ALIVE,
+                 timeout: float = REQUEST_TIMEOUT):
+        """
+        Args:
+            pool_connections: Number of per-host pools to keep
+            pool_maxsize: Maximum connections kept open per host
+            pool_block: Block when the per-host limit is reached instead of
+                opening a throwaway connection
+            keep_alive: Reuse connections between requests
+            timeout: Default request timeout in seconds
+        """
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._connections = 0
+
+        self._adapter = _CountingAdapter(
+            self._on_connect,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    def get(self, url: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
+        """Send a GET request through the shared pool"""
+        kwargs.setdefault("timeout", self.timeout)
+        with self._lock:
+            self._requests += 1
+        return self.session.get(url, params=params, **kwargs)
+
+    def _on_connect(self):
+        """Record a new TCP connection"""
+        with self._lock:
+            self._connections += 1
+
+    def get_stats(self) -> Dict:
+        """Get connection reuse statistics"""
+        with self._lock:
+            requests_sent = self._requests
+            opened = self._connections
+        reused = max(requests_sent - opened, 0)
+        return {
+            "requests": requests_sent,
+            "connections_opened": opened,
+            "connections_reused": reused,
+            "reuse_ratio": reused / requests_sent if requests_sent else 0.0
+        }
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+def get_shared_session() -> PooledHTTPSession:
+    """Get the process-wide session used when no client session is supplied"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = PooledHTTPSession()
+        return _shared_session
@@ -0,0 +1,173 @@
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import requests
+from .config import CACHE_DIR
+from .disk_cache import atomic_write_bytes
+from .singleflight import SingleFlight
+
+# Common country names and aliases mapped to ISO 3166 codes used by the API
+COUNTRY_ALIASES = {
+    "uk": "gb",
+    "united kingdom": "gb",
+    "great britain": "gb",
+    "england": "gb",
+    "scotland": "gb",
+    "wales": "gb",
+    "usa": "us",
+    "u.s.": "us",
+    "u.s.a.": "us",
+    "united states": "us",
+    "america": "us",
+    "uae": "ae",
+    "south korea": "kr",
+    "germany": "de",
+    "deutschland": "de",
+    "france": "fr",
+    "spain": "es",
+    "italy": "it",
+    "india": "in",
+    "japan": "jp",
+    "china": "cn",
+    "canada": "ca",
+    "australia": "au",
+    "brazil": "br",
+    "mexico": "mx",
+    "russia": "ru"
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+class LocationNotFound(requests.exceptions.RequestException):
+    """Raised when a query does not match any known location"""
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a free-text location query
+
+    Lowercases, collapses whitespace, trims comma-separated parts and maps
+    country aliases, so "London, UK", "london,gb" and " LONDON , gb " all
+    become "london,gb".
+    """
+    parts = [_WHITESPACE.sub(" ", part).strip() for part in query.lower().split(",")]
+    parts = [part for part in parts if part]
+    if len(parts) > 1:
+        parts[-1] = COUNTRY_ALIASES.get(parts[-1], parts[-1])
+    return ",".join(parts)
+
+def get_location_id(lat: float, lon: float) -> str:
+    """Canonical location id: coordinates rounded to about 1 km"""
+    return f"{lat:.2f},{lon:.2f}"
+
+class LocationResolver:
+    """
+    Resolve free-text queries to canonical locations, caching results on disk
+
+    Each geocoding result is stored under its normalized query. Spellings
+    that resolve to the same place share one canonical location id.
+    """
+
+    def __init__(self, geocode: Callable[[str, int], List[Dict]],
+                 path: Optional[Path] = CACHE_DIR / "locations.json", max_entries: int = 5000):
+        """
+        Args:
+            geocode: Function (query, limit) -> list of geocoding results; it
+                should raise requests.exceptions.RequestException on failure
+            path: JSON file persisting resolved queries (None to keep them in memory)
+            max_entries: Maximum number of queries remembered
+        """
+        self.geocode = geocode
+        self.path = Path(path) if path is not None else None
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries = None  # normalized query + limit -> geocoding results
+        self._flights = SingleFlight()
+
+    def _load(self) -> Dict:
+        """Load the persisted mappings on first use (lock must be held)"""
+        if self._entries is None:
+            if self.path is None:
+                self._entries = {}
+                return self._entries
+            try:
+                with open(self.path, 'rb') as f:
+                    self._entries = json.loads(f.read())
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        """Persist the mappings (lock must be held)"""
+        if self.path is None:
+            return
+        payload = json.dumps(self._entries, separators=(",", ":")).encode("utf-8")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_bytes(self.path, payload)
+        except OSError as e:
+            print(f"Error saving location cache: {e}")
+
+    def _lookup(self, query: str, limit: int) -> List[Dict]:
+        """Geocode a normalized query, from the cache when possible"""
+        entry_key = f"{query}|{limit}"
+        with self._lock:
+            results = self._load().get(entry_key)
+        if results is not None:
+            return results
+
+        results = self._flights.do(entry_key, self.geocode, query, limit)
+        if not results:
+            # Unknown places are not persisted, the provider may add them later
+            return []
+
+        results = [self._to_location(result) for result in results]
+        with self._lock:
+            entries = self._load()
+            entries[entry_key] = results
+            while len(entries) > self.max_entries:
+                del entries[next(iter(entries))]
+            self._save()
+        return results
+
+    def _to_location(self, result: Dict) -> Dict:
+        """Reduce a geocoding result to the canonical location fields"""
+        location = {
+            "id": get_location_id(result["lat"], result["lon"]),
+            "name": result.get("name", ""),
+            "country": result.get("country", ""),
+            "lat": result["lat"],
+            "lon": result["lon"]
+        }
+        if result.get("state"):
+            location["state"] = result["state"]
+        return location
+
+    def resolve(self, query: str) -> Dict:
+        """
+        Resolve a query to its best matching location
+
+        Returns:
+            Location dictionary with "id", "name", "country", "lat" and "lon"
+
+        Raises:
+            LocationNotFound: If nothing matches the query
+            requests.exceptions.RequestException: If geocoding fails
+        """
+        normalized = normalize_query(query)
+        results = self._lookup(normalized, 1) if normalized else []
+        if not results:
+            raise LocationNotFound(f"Location not found: {query}")
+        return results[0]
+
+    def search(self, query: str, limit: int = 5) -> List[Dict]:
+        """
+        Find locations matching a query
+
+        Raises:
+            requests.exceptions.RequestException: If geocoding fails
+        """
+        normalized = normalize_query(query)
+        return self._lookup(normalized, limit) if normalized else []
@@ -0,0 +1,202 @@
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+def estimate_size(value: Any) -> int:
+    """Approximate the memory footprint of a cached value in bytes"""
+    try:
+        return len(json.dumps(value, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by entry count and approximate size, with TTL expiry
+
+    Entries are stored as (value, timestamp). Expired entries stay readable
+    as stale data for stale_ttl seconds, then are dropped on access and by
+    purge_expired(), which can run on a background thread.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None, stale_ttl: float = 0):
+        """
+        Args:
+            max_entries: Maximum number of entries kept
+            max_bytes: Maximum approximate total size of values (None for no limit)
+            ttl: Seconds an entry stays valid (None for no expiry)
+            stale_ttl: Extra seconds an expired entry is retained so it can
+                still be read with allow_stale=True
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+        self._entries = OrderedDict()  # key -> (value, timestamp, size)
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        self._purge_stop = None
+
+    def _is_expired(self, timestamp: float, now: float) -> bool:
+        """Check if an entry stored at timestamp has outlived the TTL"""
+        return self.ttl is not None and now - timestamp >= self.ttl
+
+    def _is_dead(self, timestamp: float, now: float) -> bool:
+        """Check if an entry has outlived the TTL and the stale retention window"""
+        return self.ttl is not None and now - timestamp >= self.ttl + self.stale_ttl
+
+    def _remove(self, key: Hashable):
+        """Remove an entry (lock must be held)"""
+        _, _, size = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value for key if present and not expired"""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else default
+
+    def get_entry(self, key: Hashable, allow_stale: bool = False) -> Optional[Tuple[Any, float]]:
+        """
+        Return (value, timestamp) for key if present and not expired
+
+        Args:
+            key: Cache key
+            allow_stale: Also return expired entries still within stale_ttl
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            value, timestamp, _ = entry
+            now = time.time()
+            if self._is_dead(timestamp, now):
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            if not allow_stale and self._is_expired(timestamp, now):
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value, timestamp
+
+    def set(self, key: Hashable, value: Any, timestamp: Optional[float] = None,
+            size: Optional[int] = None):
+        """
+        Store a value, evicting least recently used entries if over budget
+
+        Args:
+            key: Cache key
+            value: Value to store
+            timestamp: Time the value was produced (defaults to now)
+            size: Approximate size in bytes (estimated if not given)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if size is None:
+            size = estimate_size(value) if self.max_bytes is not None else 0
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, timestamp, size)
+            self._total_bytes += size
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until within limits (lock must be held)"""
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self._evictions += 1
+
+    def delete(self, key: Hashable):
+        """Remove key if present"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def purge_expired(self) -> int:
+        """
+        Remove every entry past its TTL and stale retention window
+
+        Returns:
+            Number of entries removed
+        """
+        if self.ttl is None:
+            return 0
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_, timestamp, _) in self._entries.items()
+                       if self._is_dead(timestamp, now)]
+            for key in expired:
+                self._remove(key)
+            self._expirations += len(expired)
+        return len(expired)
+
+    def start_purger(self, interval: float):
+        """Purge expired entries every interval seconds on a daemon thread"""
+        if self._purge_stop is not None:
+            return
+        self._purge_stop = threading.Event()
+        stop = self._purge_stop
+
+        def run():
+            while not stop.wait(interval):
+                self.purge_expired()
+
+        thread = threading.Thread(target=run, name="lru-cache-purger")
+        thread.daemon = True
+        thread.start()
+
+    def stop_purger(self):
+        """Stop the background purge thread"""
+        if self._purge_stop is not None:
+            self._purge_stop.set()
+            self._purge_stop = None
+
+    def get_stats(self) -> Dict:
+        """Get cache size and hit/miss/eviction statistics"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._is_expired(entry[1], time.time())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -3,10 +3,21 @@ from tkinter import messagebox
 import customtkinter as ctk
 from datetime import datetime, timedelta
 import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict
 import os
-from PIL import Image, ImageTk, ImageFilter, ImageEnhance
+import requests
+from PIL import Image, ImageTk
 from .api_client import WeatherAPIClient
+from .async_client import AsyncWeatherAPIClient
+from .background_library import BACKGROUND_MAPPINGS, BackgroundLibrary, find_backgrounds_dir
+from .backgrounds import BackgroundRenderer, BackgroundSource, GradientBackground, RenderDiskCache
+from .city_index import CityIndex
+from .forecast import Forecast, get_utc_offset, summarize_forecast
+from .locations import LocationNotFound
+from .lru_cache import LRUCache
+from .suggestions import SuggestionPipeline
 from .widgets import ModernSearchEntry, WeatherCard, ForecastCard, SettingsPanel, StatusBar
 from .utils import get_temperature_color_theme, get_weather_emoji, get_wind_direction, format_timestamp
 from .config import (
@@ -30,6 +41,15 @@ class WeatherApp:
 
         # Initialize API client
         self.api_client = WeatherAPIClient()
+        self.async_client = AsyncWeatherAPIClient(self.api_client)
+
+        # Offline city index for search suggestions (loaded on first keystroke)
+        self.city_index = CityIndex()
+        # Suggestions go upstream only for names missing from the index
+        self.suggestions = SuggestionPipeline(
+            self.root, self.city_index.suggest,
+            lambda query, limit: self.api_client.search_cities(query, limit, raise_errors=True)
+        )
 
         # Current settings
         self.current_city = DEFAULT_CITY
@@ -41,6 +61,13 @@ class WeatherApp:
         self.current_background = None
         self.background_images = {}
         self.blurred_background = None
+        self.background_renderer = BackgroundRenderer(disk_cache=RenderDiskCache())
+        self.background_photos = LRUCache(max_entries=4)
+        # Backgrounds render on one worker; results for superseded
+        # requests (older generations) are discarded
+        self._background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="background")
+        self._background_future = None
+        self._background_generation = 0
         
         # Glass effect color scheme (CustomTkinter compatible - NO TRANSPARENCY TUPLES)
         self.glass_colors = {
@@ -84,120 +111,34 @@ class WeatherApp:
         self._load_initial_data()
 
     def _load_background_images(self):
-        """Load background images from assets/backgrounds/ directory"""
-        # Try multiple possible paths for the backgrounds directory
-        possible_paths = [
-            "assets/backgrounds",
-            "./assets/backgrounds", 
-            "backgrounds",
-            "./backgrounds",
-            os.path.join(os.path.dirname(__file__), "assets", "backgrounds"),
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "backgrounds")
-        ]
-        
-        backgrounds_dir = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                backgrounds_dir = path
-                print(f"Found backgrounds directory: {backgrounds_dir}")
-                break
-        
+        """Load background images from the assets/backgrounds/ directory manifest"""
+        backgrounds_dir = find_backgrounds_dir()
         if not backgrounds_dir:
-            print("No backgrounds directory found. Creating default background.")
-            self._create_default_background()
-            return
-        
-        # Look for any image files in the directory
-        supported_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.gif']
-        found_files = []
-        
-        try:
-            for file in os.listdir(backgrounds_dir):
-                if any(file.lower().endswith(ext) for ext in supported_extensions):
-                    found_files.append(file)
-        except Exception as e:
-            print(f"Error reading backgrounds directory: {e}")
             self._create_default_background()
             return
-        
-        print(f"Found {len(found_files)} image files: {found_files}")
-        
-        # Default background mappings for different weather conditions
-        background_mappings = {
-            'clear_day': ['sunny', 'clear_day', 'sunshine', 'clear', 'day'],
-            'clear_night': ['clear_night', 'starry_night', 'night_clear', 'night', 'stars'],
-            'clouds': ['cloudy', 'overcast', 'clouds', 'cloud'],
-            'rain': ['rainy', 'rain', 'storm', 'raining'],
-            'snow': ['snowy', 'snow', 'winter', 'snowing'],
-            'thunderstorm': ['thunderstorm', 'storm', 'lightning', 'thunder'],
-            'drizzle': ['drizzle', 'light_rain', 'misty', 'mist'],
-            'mist': ['misty', 'fog', 'hazy', 'mist'],
-            'fog': ['fog', 'misty', 'hazy', 'foggy'],
-            'default': ['default', 'sky', 'landscape', 'background']
-        }
-        
-        self.background_mappings = background_mappings
-        
-        # Match found files to categories
-        for category, keywords in background_mappings.items():
-            for keyword in keywords:
-                matching_files = [f for f in found_files if keyword.lower() in f.lower()]
-                if matching_files:
-                    filepath = os.path.join(backgrounds_dir, matching_files[0])
-                    try:
-                        test_image = Image.open(filepath)
-                        test_image.close()
-                        self.background_images[category] = filepath
-                        print(f"Mapped '{category}' to '{matching_files[0]}'")
-                        break
-                    except Exception as e:
-                        print(f"Error testing image {filepath}: {e}")
-                        continue
-        
-        # If no specific mappings found, use any available images as defaults
-        if len(self.background_images) == 0 and found_files:
-            print("No specific mappings found, using first available image as default")
-            filepath = os.path.join(backgrounds_dir, found_files[0])
-            try:
-                test_image = Image.open(filepath)
-                test_image.close()
-                self.background_images['default'] = filepath
-                for category in ['clear_day', 'clouds', 'rain', 'snow']:
-                    self.background_images[category] = filepath
-            except Exception as e:
-                print(f"Error with fallback image {filepath}: {e}")
-                self._create_default_background()
-                return
-        
+
+        self.background_library = BackgroundLibrary(backgrounds_dir)
+        self.background_mappings = BACKGROUND_MAPPINGS
+        self.background_images.update(self.background_library.get_backgrounds())
+
+        # The manifest already has content hashes; spare the render cache
+        # from reading every source again
+        disk_cache = self.background_renderer.disk_cache
+        if disk_cache is not None:
+            for path, entry in self.background_library.get_files().items():
+                disk_cache.add_source_hash(path, entry["mtime_ns"], entry["size"], entry["hash"])
+
         if len(self.background_images) == 0:
             self._create_default_background()
-        else:
-            print(f"Successfully loaded {len(self.background_images)} background images")
 
     def _create_default_background(self):
-        """Create a default gradient background if no images are found"""
-        width, height = WINDOW_WIDTH, WINDOW_HEIGHT
-        image = Image.new('RGB', (width, height), color=(74, 144, 226))
-        
-        # Create gradient effect
-        for y in range(height):
-            r = int(74 + (144 - 74) * y / height)
-            g = int(144 + (102 - 144) * y / height)  
-            b = int(226 + (185 - 226) * y / height)
-            
-            for x in range(width):
-                image.putpixel((x, y), (r, g, b))
-        
-        # Save to temp file
-        import tempfile
-        temp_path = os.path.join(tempfile.gettempdir(), 'default_weather_bg.png')
-        image.save(temp_path)
-        
-        self.background_images['default'] = temp_path
+        """Use a gradient background if no images are found"""
+        gradient = GradientBackground()
+        self.background_images['default'] = gradient
         for category in ['clear_day', 'clouds', 'rain', 'snow', 'clear_night']:
-            self.background_images[category] = temp_path
+            self.background_images[category] = gradient
 
-    def _get_appropriate_background(self, weather_data: Dict) -> str:
+    def _get_appropriate_background(self, weather_data: Dict) -> Optional[BackgroundSource]:
         """Determine the most appropriate background based on weather conditions"""
         if not weather_data:
             return self.background_images.get('default')
@@ -240,81 +181,87 @@ class WeatherApp:
         
         return self.background_images.get('default')
 
-    def _create_glass_background(self, image_path: str) -> ImageTk.PhotoImage:
-        """Create a background with glass effect (high blur, darkened)"""
-        if not image_path or not os.path.exists(image_path):
-            return None
-        
+    def _get_background_size(self) -> tuple:
+        """Current window size to render backgrounds at"""
+        # Geometry is current once the window is mapped; forcing it with
+        # update_idletasks() would re-enter Tk from the render path
+        window_width = self.root.winfo_width()
+        window_height = self.root.winfo_height()
+
+        if window_width < 100 or window_height < 100:
+            window_width = WINDOW_WIDTH
+            window_height = WINDOW_HEIGHT
+        return window_width, window_height
+
+    def _create_glass_background(self, key, image: Image.Image) -> ImageTk.PhotoImage:
+        """Convert a rendered glass background to a Tk image (Tk thread only)"""
+        # Converted images are kept too, so toggling between
+        # conditions does not create a new Tk image each time
+        photo = self.background_photos.get(key)
+        if photo is None:
+            photo = ImageTk.PhotoImage(image)
+            self.background_photos.set(key, photo)
+        return photo
+
+    def _update_background(self, source: BackgroundSource):
+        """Update the background image, rendering it on a worker thread"""
+        if not source or (isinstance(source, str) and not os.path.exists(source)):
+            return
+
+        self._background_generation += 1
+        generation = self._background_generation
+        size = self._get_background_size()
+
+        # Already rendered at this size: show it without a round trip
+        key, image = self.background_renderer.get_cached(source, size)
+        if image is not None:
+            self._apply_background(generation, key, image)
+            return
+
+        # Drop a queued render that this one supersedes
+        if self._background_future is not None:
+            self._background_future.cancel()
+        self._background_future = self._background_executor.submit(
+            self._render_background, generation, source, size
+        )
+
+    def _render_background(self, generation: int, source: BackgroundSource, size: tuple):
+        """Render a glass background (worker thread) and hand it to the Tk thread"""
+        if generation != self._background_generation:
+            return
         try:
-            image = Image.open(image_path)
-            
-            # Get current window size
-            self.root.update_idletasks()
-            window_width = self.root.winfo_width()
-            window_height = self.root.winfo_height()
-            
-            if window_width < 100 or window_height < 100:
-                window_width = WINDOW_WIDTH
-                window_height = WINDOW_HEIGHT
-            
-            # Resize and crop image to fit window
-            image_ratio = image.width / image.height
-            window_ratio = window_width / window_height
-            
-            if image_ratio > window_ratio:
-                new_height = window_height
-                new_width = int(window_height * image_ratio)
-            else:
-                new_width = window_width
-                new_height = int(window_width / image_ratio)
-            
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Center crop
-            if new_width > window_width:
-                left = (new_width - window_width) // 2
-                image = image.crop((left, 0, left + window_width, new_height))
-            elif new_height > window_height:
-                top = (new_height - window_height) // 2
-                image = image.crop((0, top, new_width, top + window_height))
-            
-            # Apply heavy blur for glass effect
-            blurred = image.filter(ImageFilter.GaussianBlur(radius=25))
-            
-            # Darken the image significantly for better contrast
-            enhancer = ImageEnhance.Brightness(blurred)
-            darkened = enhancer.enhance(0.4)  # Make it 40% of original brightness
-            
-            return ImageTk.PhotoImage(darkened)
-            
+            key, image = self.background_renderer.render(source, size)
         except Exception as e:
             print(f"Error creating glass background: {e}")
-            return None
+            return
+        if image is not None:
+            self.root.after(0, self._apply_background, generation, key, image)
 
-    def _update_background(self, image_path: str):
-        """Update the background image"""
-        if not image_path or not os.path.exists(image_path):
+    def _apply_background(self, generation: int, key, image: Image.Image):
+        """Show a rendered background unless a newer one was requested"""
+        if generation != self._background_generation:
             return
-        
+
         try:
-            glass_bg = self._create_glass_background(image_path)
-            if not glass_bg:
+            glass_bg = self._create_glass_background(key, image)
+            if glass_bg is self.blurred_background:
+                # Same condition and window size, nothing to redraw
                 return
-            
+
             if self.background_label is None:
                 self.background_label = tk.Label(self.root, image=glass_bg, bg=self.glass_colors["main_bg"])
                 self.background_label.place(x=0, y=0, relwidth=1, relheight=1)
             else:
                 self.background_label.configure(image=glass_bg)
                 self.background_label.place(x=0, y=0, relwidth=1, relheight=1)
-            
+
             self.blurred_background = glass_bg
             self.background_label.lower()
-            
+
             # Ensure UI elements are above background
             if self.main_frame:
                 self.main_frame.lift()
-                
+
         except Exception as e:
             print(f"Error updating background: {e}")
 
@@ -351,9 +298,9 @@ class WeatherApp:
     def _delayed_background_update(self):
         """Update background after delay"""
         if self.current_weather_data:
-            background_path = self._get_appropriate_background(self.current_weather_data)
-            if background_path:
-                self._update_background(background_path)
+            background = self._get_appropriate_background(self.current_weather_data)
+            if background:
+                self._update_background(background)
 
     def _create_top_section(self):
         """Create top section with search and controls"""
@@ -376,7 +323,8 @@ class WeatherApp:
 
         self.search_entry = ModernSearchEntry(
             search_frame,
-            search_callback=self._on_search
+            search_callback=self._on_search,
+            suggestion_provider=self.suggestions.request
         )
         self.search_entry.pack(fill="x", padx=15, pady=15)
 
@@ -759,9 +707,28 @@ class WeatherApp:
         if not city:
             messagebox.showerror("Error", "Please enter a city name")
             return
+
         self.current_city = city
         self._load_weather_data()
 
+    def _on_city_not_found(self, city: str):
+        """Offer a correction from the offline index for a city the geocoder does not know"""
+        if city != self.current_city:
+            # Another search was started meanwhile
+            return
+
+        if not self.city_index.contains(city):
+            matches = self.city_index.fuzzy_search(city, limit=1)
+            if matches:
+                correction = f"{matches[0]['name']}, {matches[0]['country']}"
+                if messagebox.askyesno("Did you mean?",
+                                       f"No location matches \"{city}\".\n\nDid you mean {correction}?"):
+                    self.search_entry.set_text(correction)
+                    self._on_search(correction)
+                return
+
+        self._show_error(f"City not found: {city}")
+
     def _refresh_data(self):
         """Refresh weather data"""
         self._load_weather_data()
@@ -780,14 +747,29 @@ class WeatherApp:
 
     def _fetch_weather_data(self):
         """Fetch weather data from API"""
+        city = self.current_city
         try:
-            current_data = self.api_client.get_current_weather(self.current_city, self.current_units)
+            # Resolve first so an unknown place can be told apart from an
+            # outage; the weather requests then reuse the cached location
+            try:
+                self.api_client.resolve_city(city)
+            except LocationNotFound:
+                self.root.after(0, self._on_city_not_found, city)
+                return
+            except requests.exceptions.RequestException:
+                # Geocoding unavailable; the weather requests fall back to
+                # the city name and report their own errors
+                pass
+
+            # Current weather and forecast are requested concurrently
+            current_data, forecast_data = asyncio.run(
+                self.async_client.get_weather_and_forecast(city, self.current_units)
+            )
 
             if current_data:
                 self.current_weather_data = current_data
-                forecast_data = self.api_client.get_forecast(self.current_city, self.current_units)
                 if forecast_data:
-                    self.forecast_data = forecast_data
+                    self.forecast_data = Forecast.from_payload(forecast_data)
 
                 self.root.after(0, self._update_ui)
             else:
@@ -804,9 +786,9 @@ class WeatherApp:
         data = self.current_weather_data
 
         # Update background
-        background_path = self._get_appropriate_background(data)
-        if background_path:
-            self._update_background(background_path)
+        background = self._get_appropriate_background(data)
+        if background:
+            self._update_background(background)
 
         # Update main weather info
         city_name = data.get('name', '')
@@ -837,7 +819,16 @@ class WeatherApp:
             self._update_forecast()
 
         # Update status
-        self.status_bar.update_status("Weather data loaded successfully")
+        if data.get('_stale'):
+            minutes = int(data.get('_age', 0) // 60)
+            status = f"Showing cached data ({minutes} min old)"
+        else:
+            status = "Weather data loaded successfully"
+        if data.get('dt'):
+            # Observation time on the city's clock, as the forecast cards use
+            observed = format_timestamp(data['dt'], "%H:%M", get_utc_offset(data))
+            status = f"{status} - observed {observed} local time"
+        self.status_bar.update_status(status)
         self.status_bar.update_time()
 
         # Setup auto-refresh
@@ -869,55 +860,21 @@ class WeatherApp:
 
     def _update_forecast(self):
         """Update 5-day forecast cards"""
-        if not self.forecast_data or 'list' not in self.forecast_data:
+        if not self.forecast_data:
             return
 
-        # Group forecast by day
-        daily_forecasts = {}
-        for item in self.forecast_data['list']:
-            date = datetime.fromtimestamp(item['dt']).strftime('%Y-%m-%d')
-            if date not in daily_forecasts:
-                daily_forecasts[date] = []
-            daily_forecasts[date].append(item)
-
         # Update forecast cards
         temp_symbol = self._get_temp_symbol()
-        for i, (date, forecasts) in enumerate(list(daily_forecasts.items())[:5]):
-            if i >= len(self.forecast_cards):
-                break
-
-            # Get day name
-            day_name = datetime.strptime(date, '%Y-%m-%d').strftime('%a')
-            if i == 0:
-                day_name = "Today"
-            elif i == 1:
-                day_name = "Tomorrow"
-
-            # Calculate high/low temperatures
-            temps = [f['main']['temp'] for f in forecasts]
-            temp_high = max(temps)
-            temp_low = min(temps)
-
-            # Get most common weather condition
-            conditions = [f['weather'][0] for f in forecasts]
-            main_condition = max(set(c['main'] for c in conditions), 
-                               key=lambda x: sum(1 for c in conditions if c['main'] == x))
-
-            # Get icon and description
-            icon_codes = [c['icon'] for c in conditions]
-            main_icon = max(set(icon_codes), key=icon_codes.count)
-            emoji = get_weather_emoji(main_condition, main_icon)
-
-            descriptions = [c['description'] for c in conditions]
-            main_desc = max(set(descriptions), key=descriptions.count)
+        for i, day in enumerate(summarize_forecast(self.forecast_data, days=len(self.forecast_cards))):
+            emoji = get_weather_emoji(day['condition'], day['icon'])
 
             # Update card
             self.forecast_cards[i].update_forecast(
-                day_name,
+                day['label'],
                 emoji,
-                f"{temp_high:.0f}°{temp_symbol}",
-                f"{temp_low:.0f}°{temp_symbol}",
-                main_desc.title()
+                f"{day['temp_high']:.0f}°{temp_symbol}",
+                f"{day['temp_low']:.0f}°{temp_symbol}",
+                day['description'].title()
             )
 
     def _get_temp_symbol(self) -> str:
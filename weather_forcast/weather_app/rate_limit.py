@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import Dict, Optional
+import requests
+
+class RateLimitTimeout(requests.exceptions.RequestException):
+    """Raised when a request would have to wait longer than allowed for a rate limit slot"""
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter with a FIFO wait queue
+
+    Each caller reserves the next free slot under a short lock and then
+    sleeps until that slot outside the lock. Waiters are therefore served in
+    arrival order, and up to burst calls can go out back to back.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        """
+        Args:
+            rate_per_minute: Sustained number of calls allowed per minute
+            burst: Number of calls that may be made back to back
+        """
+        self.rate_per_minute = rate_per_minute
+        self.burst = max(1, burst)
+        self._interval = 60.0 / rate_per_minute
+        self._tolerance = (self.burst - 1) * self._interval
+
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()  # theoretical time of the next call
+
+        self._acquired = 0
+        self._throttled = 0
+        self._rejected = 0
+        self._waiting = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _reserve(self, timeout: Optional[float]) -> Optional[float]:
+        """Reserve a slot and return the seconds to wait for it, or None if too long"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            wait = max(0.0, slot - self._tolerance - now)
+            if timeout is not None and wait > timeout:
+                self._rejected += 1
+                return None
+
+            self._next_slot = slot + self._interval
+            self._acquired += 1
+            if wait > 0:
+                self._throttled += 1
+                self._waiting += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            return wait
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a call is allowed
+
+        Args:
+            timeout: Maximum seconds to wait (None to wait indefinitely)
+
+        Returns:
+            True if a slot was acquired, False if it would exceed timeout
+        """
+        wait = self._reserve(timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+            with self._lock:
+                self._waiting -= 1
+        return True
+
+    def defer(self, seconds: float):
+        """Hold back every future call for seconds, e.g. after a 429 response"""
+        with self._lock:
+            earliest = time.monotonic() + seconds + self._tolerance
+            self._next_slot = max(self._next_slot, earliest)
+
+    def get_stats(self) -> Dict:
+        """Get throttling statistics"""
+        with self._lock:
+            return {
+                "rate_per_minute": self.rate_per_minute,
+                "burst": self.burst,
+                "acquired": self._acquired,
+                "throttled": self._throttled,
+                "rejected": self._rejected,
+                "waiting": self._waiting,
+                "total_wait": self._total_wait,
+                "max_wait": self._max_wait,
+                "average_wait": self._total_wait / self._throttled if self._throttled else 0.0
+            }
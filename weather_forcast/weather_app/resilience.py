@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+from typing import Dict, Optional
+import requests
+
+# HTTP status codes worth retrying: rate limited or upstream trouble
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request while the circuit breaker is open"""
+
+def is_transient_error(error: Exception) -> bool:
+    """Check if a request error is likely to go away on retry"""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Read the Retry-After header (in seconds) from an HTTP error response"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    retry_after = response.headers.get("Retry-After", "")
+    return float(retry_after) if retry_after.isdigit() else None
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient request errors"""
+
+    def __init__(self, max_retries: int = 2, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 jitter: bool = True):
+        """
+        Args:
+            max_retries: Retries after the first attempt
+            backoff_base: Delay before the first retry, doubled for each retry
+            backoff_max: Upper bound on a single delay
+            jitter: Randomize delays between 0 and the backoff value
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+
+    def get_delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Get the delay before retrying after a failed attempt
+
+        Args:
+            attempt: Zero-based index of the attempt that failed
+            retry_after: Delay requested by the server, if any
+
+        Returns:
+            Seconds to wait, or None if no retry should be made
+        """
+        if attempt >= self.max_retries:
+            return None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.backoff_max else None
+
+        backoff = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+class CircuitBreaker:
+    """
+    Fail fast while the upstream service is down
+
+    After failure_threshold consecutive transient failures the circuit opens
+    and calls are rejected for recovery_timeout seconds. Then a single probe
+    call is let through (half-open): success closes the circuit, failure
+    opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds to stay open before probing again
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Current circuit state"""
+        with self._lock:
+            return self._state
+
+    def before_call(self):
+        """
+        Check that a call may proceed
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    self._rejected += 1
+                    raise CircuitOpenError("Weather service unavailable, circuit open")
+                self._state = self.HALF_OPEN
+
+            if self._state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self._rejected += 1
+                    raise CircuitOpenError("Weather service unavailable, waiting for probe")
+                self._probe_in_flight = True
+
+    def record_success(self):
+        """Record a call that reached the service"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Record a transient failure"""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict:
+        """Get circuit state and counters"""
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "times_opened": self._times_opened,
+                "rejected": self._rejected
+            }
@@ -0,0 +1,193 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from .city_index import fold_name
+from .config import SUGGEST_DEBOUNCE_MS, SUGGEST_MIN_CHARS
+from .locations import normalize_query
+from .lru_cache import LRUCache
+
+# Characters that end a word; an upstream result covers longer queries
+# only up to the next word
+WORD_SEPARATORS = " ,"
+
+def filter_suggestions(results: List[Dict], query: str) -> List[Dict]:
+    """Keep the results whose name (and country, if given) start with a normalized query"""
+    name, _, country = query.partition(",")
+    name = fold_name(name)
+    return [result for result in results
+            if fold_name(result.get("name", "")).startswith(name)
+            and result.get("country", "").lower().startswith(country)]
+
+class SuggestionPipeline:
+    """
+    Debounced, cancellable city suggestions for a search entry
+
+    Local (offline index) results are delivered at once. When the index has
+    nothing, an upstream search runs on a worker thread after typing pauses
+    for debounce_ms. Superseded searches are cancelled or their results
+    dropped, and results come back to the Tk thread via after(). Upstream
+    results are cached by query, and longer queries within the same word
+    are filtered from them, so a typed word costs at most one upstream call.
+    """
+
+    def __init__(self, widget, local_search: Callable[[str, int], List[Dict]],
+                 remote_search: Optional[Callable[[str, int], List[Dict]]] = None,
+                 debounce_ms: int = SUGGEST_DEBOUNCE_MS, min_chars: int = SUGGEST_MIN_CHARS,
+                 limit: int = 6, cache_entries: int = 256):
+        """
+        Args:
+            widget: Tk widget used to schedule work on the Tk thread
+            local_search: Fast function (query, limit) -> suggestions
+            remote_search: Blocking function (query, limit) -> suggestions,
+                run on a worker thread (None for local suggestions only).
+                It must raise on failure: its results are cached for the
+                session, so an empty list would hide the query's cities
+                even after the API recovers.
+            debounce_ms: Pause in typing before an upstream search starts
+            min_chars: Shortest query that gets suggestions
+            limit: Maximum number of suggestions
+            cache_entries: Upstream results remembered
+        """
+        self.widget = widget
+        self.local_search = local_search
+        self.remote_search = remote_search
+        self.debounce_ms = debounce_ms
+        self.min_chars = min_chars
+        self.limit = limit
+
+        self._cache = LRUCache(max_entries=cache_entries)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="city-suggest")
+        self._generation = 0
+        self._timer = None
+        self._waiting = None  # (query, callback) waiting for upstream results
+        self._in_flight: Dict[str, Future] = {}
+
+        self._stats_lock = threading.Lock()
+        self._local = 0
+        self._upstream_calls = 0
+        self._cache_hits = 0
+        self._cancelled = 0
+
+    def _covers(self, prefix: str, query: str) -> bool:
+        """Check if results for prefix also answer query (same word, longer text)"""
+        if not query.startswith(prefix):
+            return False
+        return not any(c in WORD_SEPARATORS for c in query[len(prefix):])
+
+    def _answer(self, searched: str, results: List[Dict], query: str) -> List[Dict]:
+        """Narrow results of an upstream search for searched down to query"""
+        if searched != query:
+            results = filter_suggestions(results, query)
+        return results[:self.limit]
+
+    def _from_cache(self, query: str) -> Optional[List[Dict]]:
+        """Answer a query from cached upstream results of it or a shorter query"""
+        for length in range(len(query), self.min_chars - 1, -1):
+            if length < len(query) and query[length] in WORD_SEPARATORS:
+                break
+            results = self._cache.get(query[:length])
+            if results is not None:
+                return self._answer(query[:length], results, query)
+        return None
+
+    def request(self, query: str, callback: Callable[[List[Dict]], None]):
+        """
+        Ask for suggestions; call from the Tk thread on every keystroke
+
+        Supersedes any earlier request. callback is called on the Tk thread,
+        at once or when upstream results arrive, and not at all if the
+        request is superseded first.
+        """
+        self.cancel()
+        normalized = normalize_query(query)
+        if len(normalized) < self.min_chars:
+            callback([])
+            return
+
+        results = self.local_search(query, self.limit)
+        if results or self.remote_search is None:
+            with self._stats_lock:
+                self._local += 1
+            callback(results)
+            return
+
+        cached = self._from_cache(normalized)
+        if cached is not None:
+            with self._stats_lock:
+                self._cache_hits += 1
+            callback(cached)
+            return
+
+        self._waiting = (normalized, callback)
+        if any(self._covers(key, normalized) for key in self._in_flight):
+            # A search for an earlier part of this word is already running
+            return
+        generation = self._generation
+        self._timer = self.widget.after(self.debounce_ms, self._start_remote, generation)
+
+    def cancel(self):
+        """Drop the pending request and any upstream search not yet started"""
+        self._generation += 1
+        self._waiting = None
+        if self._timer is not None:
+            self.widget.after_cancel(self._timer)
+            self._timer = None
+        for query, future in list(self._in_flight.items()):
+            if future.cancel():
+                del self._in_flight[query]
+                with self._stats_lock:
+                    self._cancelled += 1
+
+    def _start_remote(self, generation: int):
+        """Start the upstream search once typing has paused"""
+        self._timer = None
+        if generation != self._generation or self._waiting is None:
+            return
+        query, callback = self._waiting
+        cached = self._from_cache(query)
+        if cached is not None:
+            self._waiting = None
+            callback(cached)
+            return
+        with self._stats_lock:
+            self._upstream_calls += 1
+        future = self._executor.submit(self.remote_search, query, self.limit)
+        self._in_flight[query] = future
+        future.add_done_callback(
+            lambda f: self.widget.after(0, self._on_remote_done, query, f))
+
+    def _on_remote_done(self, query: str, future: Future):
+        """Cache upstream results and deliver them if still wanted (Tk thread)"""
+        if self._in_flight.get(query) is future:
+            del self._in_flight[query]
+        if future.cancelled():
+            return
+        try:
+            results = future.result()
+        except Exception as e:
+            print(f"Error fetching city suggestions: {e}")
+            results = None
+
+        # Failures are not cached, so the next keystroke asks again
+        if results is not None:
+            self._cache.set(query, results)
+        if self._waiting is not None and self._covers(query, self._waiting[0]):
+            waiting_query, callback = self._waiting
+            self._waiting = None
+            callback(self._answer(query, results or [], waiting_query))
+
+    def get_stats(self) -> Dict:
+        """Get counts of local answers, cache hits, upstream calls and cancellations"""
+        with self._stats_lock:
+            return {
+                "local": self._local,
+                "cache_hits": self._cache_hits,
+                "upstream_calls": self._upstream_calls,
+                "cancelled": self._cancelled,
+                "in_flight": len(self._in_flight)
+            }
+
+    def close(self):
+        """Cancel pending work and stop the worker thread"""
+        self.cancel()
+        self._executor.shutdown(wait=False)
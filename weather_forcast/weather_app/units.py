@@ -0,0 +1,93 @@
+from typing import Dict, Optional
+
+# Units the API is queried in; every other unit system is derived locally
+CANONICAL_UNITS = "metric"
+
+# App unit names mapped to OpenWeatherMap "units" parameter values
+API_UNITS = {
+    "metric": "metric",
+    "imperial": "imperial",
+    "kelvin": "standard"
+}
+
+# Temperature fields in the "main" block of current and forecast payloads
+TEMPERATURE_FIELDS = ("temp", "feels_like", "temp_min", "temp_max")
+# Temperature differences (scaled but not offset)
+TEMPERATURE_DELTA_FIELDS = ("temp_kf",)
+# Speed fields in the "wind" block
+SPEED_FIELDS = ("speed", "gust")
+
+MPS_TO_MPH = 2.236936
+
+def celsius_to(units: str, celsius: float) -> float:
+    """Convert a Celsius temperature to the given unit system"""
+    if units == "imperial":
+        return round(celsius * 9 / 5 + 32, 2)
+    if units == "kelvin":
+        return round(celsius + 273.15, 2)
+    return celsius
+
+def celsius_delta_to(units: str, delta: float) -> float:
+    """Convert a Celsius temperature difference to the given unit system"""
+    if units == "imperial":
+        return round(delta * 9 / 5, 2)
+    return delta
+
+def mps_to(units: str, speed: float) -> float:
+    """Convert a speed in m/s to the given unit system"""
+    if units == "imperial":
+        return round(speed * MPS_TO_MPH, 2)
+    return speed
+
+def _convert_block(block: Optional[Dict], units: str, fields, convert) -> Optional[Dict]:
+    """Return a copy of block with the given numeric fields converted"""
+    if not isinstance(block, dict):
+        return block
+    converted = dict(block)
+    for field in fields:
+        value = converted.get(field)
+        if isinstance(value, (int, float)):
+            converted[field] = convert(units, value)
+    return converted
+
+def _convert_item(item: Dict, units: str) -> Dict:
+    """Convert the temperature and wind fields of a current or forecast item"""
+    converted = dict(item)
+    if "main" in item:
+        main = _convert_block(item["main"], units, TEMPERATURE_FIELDS, celsius_to)
+        converted["main"] = _convert_block(main, units, TEMPERATURE_DELTA_FIELDS, celsius_delta_to)
+    if "wind" in item:
+        converted["wind"] = _convert_block(item["wind"], units, SPEED_FIELDS, mps_to)
+    return converted
+
+def convert_current(data: Dict, units: str) -> Dict:
+    """
+    Convert a canonical (metric) current weather payload
+
+    Args:
+        data: Current weather payload in metric units
+        units: Target units (metric, imperial, kelvin)
+
+    Returns:
+        The payload itself for metric, otherwise a converted copy
+    """
+    if units == CANONICAL_UNITS or not data:
+        return data
+    return _convert_item(data, units)
+
+def convert_forecast(data: Dict, units: str) -> Dict:
+    """
+    Convert a canonical (metric) forecast payload
+
+    Args:
+        data: Forecast payload in metric units
+        units: Target units (metric, imperial, kelvin)
+
+    Returns:
+        The payload itself for metric, otherwise a converted copy
+    """
+    if units == CANONICAL_UNITS or not data:
+        return data
+    converted = dict(data)
+    converted["list"] = [_convert_item(item, units) for item in data.get("list", [])]
+    return converted
@@ -1,9 +1,12 @@
 
+import math
+import time
 import requests
 from datetime import datetime
 from typing import Tuple
 from PIL import Image, ImageTk
 from .config import OPENWEATHER_ICON_URL, ICONS_DIR, TEMP_COLOR_THEMES
+from .http_pool import PooledHTTPSession, get_shared_session
 
 def kelvin_to_celsius(kelvin: float) -> float:
     """Convert Kelvin to Celsius"""
@@ -34,13 +37,15 @@ def is_daytime(sunrise: int, sunset: int, current_time: int = None) -> bool:
         current_time = int(datetime.now().timestamp())
     return sunrise <= current_time <= sunset
 
-def download_weather_icon(icon_code: str, size: str = "@2x") -> str:
+def download_weather_icon(icon_code: str, size: str = "@2x",
+                          session: PooledHTTPSession = None) -> str:
     """
     Download weather icon from OpenWeatherMap
 
     Args:
         icon_code: Icon code from API response
         size: Icon size (@2x for larger icons)
+        session: Pooled HTTP session to reuse (defaults to the shared session)
 
     Returns:
         Path to downloaded icon file
@@ -54,7 +59,8 @@ def download_weather_icon(icon_code: str, size: str = "@2x") -> str:
 
     try:
         icon_url = f"{OPENWEATHER_ICON_URL}{icon_filename}"
-        response = requests.get(icon_url, timeout=10)
+        http = session or get_shared_session()
+        response = http.get(icon_url)
         response.raise_for_status()
 
         with open(icon_path, 'wb') as f:
@@ -66,6 +72,60 @@ def download_weather_icon(icon_code: str, size: str = "@2x") -> str:
         print(f"Error downloading icon: {e}")
         return ""
 
+# How much larger than the target an image shrunk with Image.reduce is
+# kept, so the final LANCZOS resize still has enough pixels to filter.
+# JPEG draft decoding averages whole DCT blocks, so it may go down to the
+# target itself.
+REDUCING_GAP = 2.0
+
+def open_image_reduced(image_path: str, size: Tuple[int, int], cover: bool = False) -> Image.Image:
+    """
+    Open and decode an image at the smallest scale still covering size
+
+    JPEG sources are decoded directly at 1/2, 1/4 or 1/8 scale (draft
+    mode), which cuts both decode time and memory for large photos. Other
+    formats are decoded fully, then shrunk by an integer factor with
+    Image.reduce while staying REDUCING_GAP times larger than size
+    (palette, bilevel and 16-bit images are converted first). Either
+    way the result is meant for a high-quality resize to size afterwards.
+
+    Args:
+        image_path: Path to image file
+        size: Minimum (width, height) the result must cover
+        cover: Keep the aspect ratio, so only the side that limits a cover
+            fit (scale to fill size, then crop) has to reach size
+
+    Returns:
+        Loaded image, possibly smaller than the source
+    """
+    width, height = max(1, size[0]), max(1, size[1])
+    with Image.open(image_path) as source:
+        if cover:
+            scale = max(width / source.width, height / source.height)
+            width, height = source.width * scale, source.height * scale
+        if source.format == "JPEG":
+            source.draft(source.mode, (math.ceil(width), math.ceil(height)))
+        source.load()
+        image = source
+
+    factor = int(min(image.width / (width * REDUCING_GAP), image.height / (height * REDUCING_GAP)))
+    if factor > 1:
+        image = _get_reducible(image).reduce(factor)
+    return image
+
+def _get_reducible(image: Image.Image) -> Image.Image:
+    """Convert an image to a mode whose pixels Image.reduce can average"""
+    # reduce rejects 1 and I;16 images, and averaging palette indices
+    # would mix unrelated colours
+    if image.mode in ("P", "PA"):
+        has_alpha = image.mode == "PA" or "transparency" in image.info
+        return image.convert("RGBA" if has_alpha else "RGB")
+    if image.mode == "1":
+        return image.convert("L")
+    if image.mode.startswith("I;16"):
+        return image.convert("I")
+    return image
+
 def load_and_resize_image(image_path: str, size: Tuple[int, int]) -> ImageTk.PhotoImage:
     """
     Load and resize an image for tkinter
@@ -78,7 +138,7 @@ def load_and_resize_image(image_path: str, size: Tuple[int, int]) -> ImageTk.Pho
         PhotoImage object for tkinter
     """
     try:
-        image = Image.open(image_path)
+        image = open_image_reduced(image_path, size)
         image = image.resize(size, Image.Resampling.LANCZOS)
         return ImageTk.PhotoImage(image)
     except Exception as e:
@@ -87,9 +147,19 @@ def load_and_resize_image(image_path: str, size: Tuple[int, int]) -> ImageTk.Pho
         placeholder = Image.new('RGB', size, color='lightgray')
         return ImageTk.PhotoImage(placeholder)
 
-def format_timestamp(timestamp: int, format_str: str = "%H:%M") -> str:
-    """Format unix timestamp to readable time"""
-    return datetime.fromtimestamp(timestamp).strftime(format_str)
+def format_timestamp(timestamp: int, format_str: str = "%H:%M", utc_offset: int = None) -> str:
+    """
+    Format unix timestamp to readable time
+
+    Args:
+        timestamp: Unix timestamp
+        format_str: strftime format
+        utc_offset: City timezone in seconds ("timezone" in API payloads);
+            None for this computer's timezone
+    """
+    if utc_offset is None:
+        return datetime.fromtimestamp(timestamp).strftime(format_str)
+    return time.strftime(format_str, time.gmtime(timestamp + utc_offset))
 
 def get_wind_direction(degrees: float) -> str:
     """Convert wind degrees to cardinal direction"""
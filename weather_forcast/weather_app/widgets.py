@@ -8,10 +8,23 @@ from datetime import datetime
 class ModernSearchEntry(ctk.CTkFrame):
     """Modern search entry with autocomplete functionality"""
 
-    def __init__(self, parent, search_callback: Callable = None, **kwargs):
+    MAX_SUGGESTIONS = 6
+
+    def __init__(self, parent, search_callback: Callable = None,
+                 suggestion_provider: Callable[[str, Callable[[List[Dict]], None]], None] = None,
+                 **kwargs):
+        """
+        Args:
+            parent: Parent widget
+            search_callback: Called with the query when a search is submitted
+            suggestion_provider: Called as (query, callback) on every change;
+                it must not block and calls callback on the Tk thread with city
+                dictionaries ("name", "country"), e.g. SuggestionPipeline.request
+        """
         super().__init__(parent, **kwargs)
 
         self.search_callback = search_callback
+        self.suggestion_provider = suggestion_provider
         self.suggestions = []
 
         # Create search entry
@@ -39,24 +52,75 @@ class ModernSearchEntry(ctk.CTkFrame):
         )
         self.search_button.pack(side="right")
 
-        # Autocomplete dropdown (initially hidden)
-        self.dropdown_frame = ctk.CTkFrame(self)
+        # Autocomplete dropdown (initially hidden), placed on the toplevel so
+        # it can overlap the widgets below the search bar
+        self.dropdown_frame = None
         self.dropdown_visible = False
+        self._selecting = False
+        self._suggest_generation = 0  # results for older text are ignored
 
         # Bind events
         self.search_entry.bind('<Return>', lambda e: self._on_search_click())
-        self.search_entry.bind('<FocusOut>', self._hide_dropdown)
+        self.search_entry.bind('<Escape>', self._hide_dropdown)
+        # Delay hiding so a click on a suggestion is handled first
+        self.search_entry.bind('<FocusOut>', lambda e: self.after(150, self._hide_dropdown))
 
     def _on_search_change(self, *args):
         """Handle search text changes for autocomplete"""
+        if self._selecting:
+            return
+        self._suggest_generation += 1
         query = self.search_var.get().strip()
-        if len(query) >= 2:
-            # Here you would typically call an API to get city suggestions
-            # For now, we'll just hide the dropdown
+        if self.suggestion_provider:
+            generation = self._suggest_generation
+            self.suggestion_provider(query, lambda results: self._on_suggestions(generation, results))
+        else:
             self._hide_dropdown()
 
+    def _on_suggestions(self, generation: int, suggestions: List[Dict]):
+        """Show suggestions unless the text has changed or was submitted since"""
+        if generation == self._suggest_generation:
+            self.show_suggestions(suggestions)
+
+    def show_suggestions(self, suggestions: List[Dict]):
+        """Show city suggestions in the dropdown"""
+        self.suggestions = suggestions[:self.MAX_SUGGESTIONS]
+        if not self.suggestions:
+            self._hide_dropdown()
+            return
+
+        if self.dropdown_frame is None:
+            self.dropdown_frame = ctk.CTkFrame(self.winfo_toplevel(), corner_radius=8)
+        for child in self.dropdown_frame.winfo_children():
+            child.destroy()
+
+        for city in self.suggestions:
+            label = f"{city['name']}, {city['country']}" if city.get('country') else city['name']
+            button = ctk.CTkButton(
+                self.dropdown_frame,
+                text=label,
+                anchor="w",
+                height=28,
+                fg_color="transparent",
+                command=lambda text=label: self._on_suggestion_click(text)
+            )
+            button.pack(fill="x", padx=4, pady=1)
+
+        toplevel = self.winfo_toplevel()
+        x = self.search_entry.winfo_rootx() - toplevel.winfo_rootx()
+        y = self.search_entry.winfo_rooty() - toplevel.winfo_rooty() + self.search_entry.winfo_height()
+        self.dropdown_frame.place(x=x, y=y, width=self.search_entry.winfo_width())
+        self.dropdown_frame.lift()
+        self.dropdown_visible = True
+
+    def _on_suggestion_click(self, text: str):
+        """Fill the entry with the chosen suggestion and search for it"""
+        self.set_text(text)
+        self._on_search_click()
+
     def _on_search_click(self):
         """Handle search button click"""
+        self._suggest_generation += 1
         if self.search_callback:
             self.search_callback(self.search_var.get().strip())
         self._hide_dropdown()
@@ -64,12 +128,15 @@ class ModernSearchEntry(ctk.CTkFrame):
     def _hide_dropdown(self, event=None):
         """Hide autocomplete dropdown"""
         if self.dropdown_visible:
-            self.dropdown_frame.pack_forget()
+            self.dropdown_frame.place_forget()
             self.dropdown_visible = False
 
     def set_text(self, text: str):
-        """Set search entry text"""
+        """Set search entry text without opening suggestions"""
+        self._selecting = True
         self.search_var.set(text)
+        self._selecting = False
+        self._hide_dropdown()
 
 class WeatherCard(ctk.CTkFrame):
     """Card widget for displaying weather information"""